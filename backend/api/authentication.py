@@ -0,0 +1,11 @@
+from rest_framework import authentication
+
+from .instrumentation import stage
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """Token authentication reported as the ``auth`` timing stage."""
+
+    def authenticate(self, request):
+        with stage('auth'):
+            return super().authenticate(request)
@@ -0,0 +1,86 @@
+"""Versioned in-process cache for the tag and ingredient catalog.
+
+The catalog version is a millisecond timestamp kept in the Django cache,
+which must be shared by all processes (Redis via ``REDIS_URL``; see the
+``api.E001`` check). It is bumped on every write to ``Tag`` or
+``Ingredient``: signals cover the admin, and ``load_ingredients`` bumps it
+explicitly after bulk writes. Each worker keeps serialized catalog
+payloads in memory, tagged with the version they were built at. Every
+request reads the shared version and rebuilds a payload whose version
+moved, so a bump from any process reaches all workers on their next
+request. The same version drives the ``ETag`` / ``Last-Modified``
+validators.
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Tuple
+
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+VERSION_KEY = 'catalog:version'
+LOCAL_CACHE_MAX_ENTRIES = 1024
+
+_local: 'OrderedDict[str, Tuple[int, object]]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version() -> None:
+    # Two bumps within one millisecond must still yield a new version.
+    version = max(int(time.time() * 1000), (cache.get(VERSION_KEY) or 0) + 1)
+    cache.set(VERSION_KEY, version, None)
+
+
+def get_or_build(key: str, build: Callable[[], object]):
+    """Return the payload for ``key`` at the current catalog version."""
+    version = get_version()
+    with _lock:
+        entry = _local.get(key)
+        if entry is not None and entry[0] == version:
+            _local.move_to_end(key)
+            return entry[1]
+    payload = build()
+    with _lock:
+        _local[key] = (version, payload)
+        _local.move_to_end(key)
+        # Least recently used first, so hot payloads such as the
+        # ingredient index survive a stream of one-off keys.
+        while len(_local) > LOCAL_CACHE_MAX_ENTRIES:
+            _local.popitem(last=False)
+    return payload
+
+
+def _etag(request, *args, **kwargs) -> str:
+    return f'"catalog-{get_version()}"'
+
+
+def _last_modified(request, *args, **kwargs) -> datetime:
+    return datetime.fromtimestamp(get_version() // 1000, tz=timezone.utc)
+
+
+def conditional(view):
+    """Answer ``304`` for unchanged catalog data and force revalidation."""
+    conditional_view = condition(
+        etag_func=_etag,
+        last_modified_func=_last_modified,
+    )(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        patch_cache_control(response, no_cache=True)
+        return response
+    return wrapper
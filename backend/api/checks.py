@@ -0,0 +1,28 @@
+import os
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Reject a per-process cache when gunicorn runs several workers.
+
+    Cache versions bumped by one worker (or by a management command)
+    would never reach the others, which then keep serving stale data.
+    """
+    workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+    backend = settings.CACHES['default']['BACKEND']
+    if workers > 1 and backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f'{backend} is private to each process, but '
+            f'GUNICORN_WORKERS={workers}.',
+            hint='Set REDIS_URL to a cache shared by all workers.',
+            id='api.E001',
+        )]
+    return []
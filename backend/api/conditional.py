@@ -0,0 +1,50 @@
+"""Cheap validators for conditional GET on recipe endpoints.
+
+A recipe response depends on the recipes themselves (``updated_at``), on
+the tags and ingredients it embeds (``catalog.get_version()``, since
+renaming a tag does not touch the recipes) and on the requesting user's
+favorites, cart and subscriptions. The latter are
+summarised by a per-user version token that is replaced whenever one of
+those relations changes. The token lives in the Django cache, which must be
+shared by all workers (see the ``api.E001`` check): a worker that kept its
+own token would answer ``304`` with stale ``is_favorited`` flags after a
+toggle served by another worker.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+
+
+def user_version_key(user_id: int) -> str:
+    return f'user-relations:v:{user_id}'
+
+
+def get_user_version(user) -> str:
+    if not user.is_authenticated:
+        return 'anonymous'
+    key = user_version_key(user.pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex[:12], None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user(user_id: int) -> None:
+    cache.delete(user_version_key(user_id))
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.md5(
+        json.dumps(parts, default=str).encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request, etag: str):
+    """Return a ``304`` response if ``etag`` matches, otherwise ``None``."""
+    return get_conditional_response(request, etag=etag)
@@ -1,15 +1,39 @@
+import uuid
+
 from rest_framework import serializers
 
+from uploads.models import Upload
+
 
 class Base64ImageField(serializers.ImageField):
+    """Image sent as a base64 data URI or as the token of an ``Upload``."""
+
+    default_error_messages = {
+        'unknown_upload': 'Загрузка не найдена.',
+    }
+
     def to_internal_value(self, data):
         from django.core.files.base import ContentFile
         import base64
-        import uuid
         if isinstance(data, str) and data.startswith('data:image'):
             header, b64data = data.split(';base64,')
             file_ext = header.split('/')[-1]
             decoded = base64.b64decode(b64data)
             file_name = f"{uuid.uuid4().hex}.{file_ext}"
             return ContentFile(decoded, name=file_name)
+        if isinstance(data, str):
+            return self._get_upload(data).as_file()
         return super().to_internal_value(data)
+
+    def _get_upload(self, token: str) -> Upload:
+        request = self.context.get('request')
+        try:
+            token = uuid.UUID(token)
+        except ValueError:
+            self.fail('invalid')
+        if request is None or request.user.is_anonymous:
+            self.fail('unknown_upload')
+        upload = Upload.objects.filter(token=token, user=request.user).first()
+        if upload is None:
+            self.fail('unknown_upload')
+        return upload
@@ -0,0 +1,99 @@
+"""Shared cache for the user-independent part of recipe representations.
+
+A fragment is the output of ``RecipeReadSerializer`` with the per-user
+flags left as placeholders. It is keyed by the recipe id, its
+``updated_at`` and the tag/ingredient catalog version. Every change to a
+recipe, its ingredients, tags or author touches ``updated_at`` in the
+database (see ``api.signals``), so the key of a changed recipe moves on
+every worker at once and a stale fragment can never be read back under
+the new ``ETag``.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import catalog
+
+
+class FragmentStats:
+    """Per-worker hit/miss counters used to size the cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'pid': os.getpid(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+        }
+
+
+stats = FragmentStats()
+
+
+class RecipeFragments:
+    """Request-scoped view of the fragment cache."""
+
+    def __init__(self, request):
+        base = request.build_absolute_uri('/')
+        self.base = hashlib.md5(base.encode()).hexdigest()[:8]
+        self.timeout = settings.RECIPE_FRAGMENT_CACHE['TTL']
+        self._keys: Dict[int, str] = {}
+        self._found: Dict[int, dict] = {}
+
+    def prime(self, recipes: Iterable) -> list:
+        """Fetch fragments for ``recipes``; return the ones that missed."""
+        recipes = [r for r in recipes if r.pk not in self._keys]
+        if not recipes:
+            return []
+        version = catalog.get_version()
+        for recipe in recipes:
+            self._keys[recipe.pk] = 'recipe-fragment:{}:{}:{}:{}'.format(
+                recipe.pk,
+                recipe.updated_at.timestamp(),
+                version,
+                self.base,
+            )
+        found = cache.get_many([self._keys[r.pk] for r in recipes])
+        missed = []
+        for recipe in recipes:
+            fragment = found.get(self._keys[recipe.pk])
+            if fragment is None:
+                missed.append(recipe)
+            else:
+                self._found[recipe.pk] = fragment
+        stats.record(len(recipes) - len(missed), len(missed))
+        return missed
+
+    def get(self, recipe) -> Optional[dict]:
+        if recipe.pk not in self._keys:
+            self.prime([recipe])
+        return self._found.get(recipe.pk)
+
+    def put(self, recipe, fragment: dict) -> None:
+        self._found[recipe.pk] = fragment
+        cache.set(self._keys[recipe.pk], fragment, self.timeout)
+
+
+def get_fragments(request) -> Optional[RecipeFragments]:
+    if request is None:
+        return None
+    fragments = getattr(request, '_recipe_fragments', None)
+    if fragments is None:
+        fragments = request._recipe_fragments = RecipeFragments(request)
+    return fragments
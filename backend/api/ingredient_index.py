@@ -0,0 +1,69 @@
+"""In-process index for ingredient autocomplete.
+
+Ingredients are kept as a case-folded, sorted list, so a prefix query is
+two ``bisect`` calls instead of a sequential ``ILIKE`` scan. Each worker
+builds the index lazily through ``catalog.get_or_build``, which checks the
+version in the shared cache on every request, so an ingredient change in
+any process (admin, ``load_ingredients``) rebuilds it on all workers.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+
+from recipes.models import Ingredient
+from . import catalog
+
+PREFIX_END = '\U0010ffff'
+
+
+class IngredientIndex:
+    def __init__(self, rows: Iterable[Tuple[int, str, str]]):
+        self._entries = sorted(
+            (name.casefold(), pk, name, unit) for pk, name, unit in rows
+        )
+        self._keys = [entry[0] for entry in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[dict]:
+        """Return up to ``limit`` matches: exact, then prefix, then contains.
+
+        Within each group results are ordered by name; an empty query
+        pages through the whole catalog.
+        """
+        needle = query.casefold()
+        end = offset + limit
+        lo = bisect_left(self._keys, needle)
+        hi = bisect_left(self._keys, needle + PREFIX_END, lo)
+        # Sorting puts an exact match ahead of the longer prefix matches.
+        matches = self._entries[lo:min(hi, lo + end)]
+        if len(matches) < end and needle:
+            for entry in self._entries:
+                if needle in entry[0] and not entry[0].startswith(needle):
+                    matches.append(entry)
+                    if len(matches) == end:
+                        break
+        return [
+            {'id': pk, 'name': name, 'measurement_unit': unit}
+            for _, pk, name, unit in matches[offset:]
+        ]
+
+
+def build_index() -> IngredientIndex:
+    return IngredientIndex(
+        Ingredient.objects.values_list('id', 'name', 'measurement_unit')
+    )
+
+
+def get_index() -> IngredientIndex:
+    return catalog.get_or_build('ingredient-index', build_index)
+
+
+def search(query: str, limit: int = None, offset: int = 0) -> List[dict]:
+    max_results = settings.INGREDIENT_SEARCH['MAX_RESULTS']
+    if limit is None or limit > max_results:
+        limit = max_results
+    return get_index().search(query, limit, offset)
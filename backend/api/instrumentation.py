@@ -0,0 +1,191 @@
+"""Per-request SQL and stage timing.
+
+``InstrumentationMiddleware`` profiles a sampled share of requests (every
+request carrying the debug token). While a request is profiled, every
+SQL statement goes through ``connection.execute_wrapper`` to count
+queries, sum their time and group them by a normalized signature, so a
+statement repeated with different parameters (an N+1) stands out.
+Authentication, serialization and rendering report themselves through
+``stage()``; the view stage spans from ``process_view`` to the moment
+the view returns its response.
+
+Results go to a ``Server-Timing`` header for staff and debug-token
+requests, and to a structured log line when the request is slow.
+"""
+from __future__ import annotations
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEBUG_TOKEN_HEADER = 'HTTP_X_DEBUG_TOKEN'
+MAX_REPORTED_DUPLICATES = 5
+PLACEHOLDER_LIST = re.compile(r'\((?:%s, )+%s\)')
+
+_current: ContextVar[Optional['RequestProfile']] = ContextVar(
+    'request_profile', default=None
+)
+
+
+def signature(sql: str) -> str:
+    """Collapse ``IN (%s, %s, ...)`` so batch sizes share a signature."""
+    return PLACEHOLDER_LIST.sub('(%s...)', sql)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.signatures: Counter = Counter()
+        self.stages: Dict[str, float] = {}
+        self._depth: Counter = Counter()
+        self._entered: Dict[str, float] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.signatures[signature(sql)] += 1
+
+    def enter(self, name: str) -> None:
+        if not self._depth[name]:
+            self._entered[name] = time.perf_counter()
+        self._depth[name] += 1
+
+    def is_open(self, name: str) -> bool:
+        return bool(self._depth[name])
+
+    def exit(self, name: str) -> None:
+        self._depth[name] -= 1
+        if not self._depth[name]:
+            elapsed = time.perf_counter() - self._entered.pop(name)
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def duplicates(self) -> list:
+        threshold = settings.INSTRUMENTATION['DUPLICATE_THRESHOLD']
+        return [
+            {'sql': sql[:200], 'count': count}
+            for sql, count in self.signatures.most_common(
+                MAX_REPORTED_DUPLICATES
+            )
+            if count >= threshold
+        ]
+
+    def timings(self) -> Dict[str, float]:
+        """Milliseconds per stage, plus ``db`` and ``total``."""
+        timings = {
+            name: elapsed * 1000 for name, elapsed in self.stages.items()
+        }
+        timings['db'] = self.db_time * 1000
+        timings['total'] = (time.perf_counter() - self.started) * 1000
+        return timings
+
+
+def current() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Attribute the enclosed time to ``name``; nesting is not counted."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    profile.enter(name)
+    try:
+        yield
+    finally:
+        profile.exit(name)
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = settings.INSTRUMENTATION
+        token = options['DEBUG_TOKEN']
+        debug = bool(token) and request.META.get(DEBUG_TOKEN_HEADER) == token
+        if not debug and random.random() >= options['SAMPLE_RATE']:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        reset = _current.set(profile)
+        try:
+            with _wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            _current.reset(reset)
+        if profile.is_open('view'):
+            # Plain Django views render inside the view itself.
+            profile.exit('view')
+        timings = profile.timings()
+
+        user = getattr(request, 'user', None)
+        if debug or (user is not None and user.is_staff):
+            response['Server-Timing'] = server_timing(profile, timings)
+        if timings['total'] >= options['SLOW_REQUEST_MS']:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'user': getattr(user, 'pk', None),
+                'queries': profile.queries,
+                'duplicates': profile.duplicates(),
+                'ms': {
+                    name: round(value, 2) for name, value in timings.items()
+                },
+            }, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = _current.get()
+        if profile is not None:
+            profile.enter('view')
+
+    def process_template_response(self, request, response):
+        # DRF responses pass here after the view returns, before rendering.
+        profile = _current.get()
+        if profile is not None and profile.is_open('view'):
+            profile.exit('view')
+        return response
+
+
+@contextmanager
+def _wrap_connections(profile: RequestProfile):
+    wrapped = []
+    try:
+        for alias in connections:
+            connection = connections[alias]
+            connection.execute_wrappers.append(profile)
+            wrapped.append(connection)
+        yield
+    finally:
+        for connection in wrapped:
+            connection.execute_wrappers.remove(profile)
+
+
+def server_timing(profile: RequestProfile, timings: Dict[str, float]) -> str:
+    entries = []
+    for name, value in timings.items():
+        entry = f'{name};dur={value:.2f}'
+        if name == 'db':
+            entry += f';desc="{profile.queries} queries"'
+        entries.append(entry)
+    return ', '.join(entries)
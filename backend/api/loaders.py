@@ -0,0 +1,96 @@
+"""Request-scoped batch loaders for per-user lookups in serializers.
+
+Serializers register the keys they are going to need (``prime``) while a
+list is being serialized; the first ``load`` resolves every pending key
+with a single ``IN`` query and the answers are memoized until the end of
+the request.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+from recipes.models import Favorite, ShoppingCart
+from users.models import Subscription
+
+BatchFn = Callable[[object, list], Dict[Hashable, object]]
+
+
+class BatchLoader:
+    def __init__(self, batch_fn: Callable[[list], dict], default=None):
+        self.batch_fn = batch_fn
+        self.default = default
+        self._cache: Dict[Hashable, object] = {}
+        self._pending: set = set()
+
+    def prime(self, keys: Iterable[Hashable]) -> None:
+        self._pending.update(key for key in keys if key not in self._cache)
+
+    def prime_values(self, values: Dict[Hashable, object]) -> None:
+        self._cache.update(values)
+        self._pending.difference_update(values)
+
+    def load(self, key: Hashable):
+        if key not in self._cache:
+            self._pending.add(key)
+            self._dispatch()
+        return self._cache[key]
+
+    def _dispatch(self) -> None:
+        keys = list(self._pending)
+        self._pending.clear()
+        results = self.batch_fn(keys)
+        for key in keys:
+            self._cache[key] = results.get(key, self.default)
+
+
+def _subscribed_author_ids(user, author_ids: list) -> dict:
+    return dict.fromkeys(
+        Subscription.objects
+        .filter(user=user, author_id__in=author_ids)
+        .values_list('author_id', flat=True),
+        True,
+    )
+
+
+def _favorited_recipe_ids(user, recipe_ids: list) -> dict:
+    return dict.fromkeys(
+        Favorite.objects
+        .filter(user=user, recipe_id__in=recipe_ids)
+        .values_list('recipe_id', flat=True),
+        True,
+    )
+
+
+def _carted_recipe_ids(user, recipe_ids: list) -> dict:
+    return dict.fromkeys(
+        ShoppingCart.objects
+        .filter(user=user, recipe_id__in=recipe_ids)
+        .values_list('recipe_id', flat=True),
+        True,
+    )
+
+
+LOADERS: Dict[str, BatchFn] = {
+    'is_subscribed': _subscribed_author_ids,
+    'is_favorited': _favorited_recipe_ids,
+    'is_in_shopping_cart': _carted_recipe_ids,
+}
+
+
+def get_loader(request, name: str) -> Optional[BatchLoader]:
+    """Return the loader ``name`` bound to ``request.user``.
+
+    Anonymous requests get ``None``: every per-user flag is false for them.
+    """
+    if request is None or request.user.is_anonymous:
+        return None
+    loaders = getattr(request, '_batch_loaders', None)
+    if loaders is None:
+        loaders = request._batch_loaders = {}
+    if name not in loaders:
+        batch_fn = LOADERS[name]
+        user = request.user
+        loaders[name] = BatchLoader(
+            lambda keys: batch_fn(user, keys),
+            default=False,
+        )
+    return loaders[name]
@@ -0,0 +1,198 @@
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import (
+    BaseCommand, CommandError, CommandParser,
+)
+from django.db import connection
+from django.test import Client
+from django.test.runner import DiscoverRunner
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Recipe
+from recipes.synthetic import Config, Generator
+from shortlinks import hits
+from shortlinks.codes import encode
+from users.models import User
+
+BUDGETS_PATH = Path(settings.BASE_DIR) / 'benchmarks' / 'budgets.json'
+DATASET = {'users': 200, 'recipes_per_user': 10, 'seed': 0}
+# Keep hit counters in memory so a flush never lands inside a measurement.
+NO_HIT_FLUSH = {'FLUSH_THRESHOLD': 10 ** 9, 'FLUSH_INTERVAL': 10 ** 9}
+
+
+def endpoints(user: User, recipe: Recipe) -> dict:
+    return {
+        'recipe-list': '/api/recipes/',
+        'recipe-list-cursor': '/api/recipes/?cursor=&limit=6',
+        'recipe-list-author': f'/api/recipes/?author={recipe.author_id}',
+        'recipe-list-tags': '/api/recipes/?tags=breakfast&tags=lunch',
+        'recipe-list-favorited': '/api/recipes/?is_favorited=1',
+        'recipe-list-in-cart': '/api/recipes/?is_in_shopping_cart=1',
+        'recipe-detail': f'/api/recipes/{recipe.pk}/',
+        'subscriptions': '/api/users/subscriptions/?recipes_limit=3',
+        'shopping-cart-txt': '/api/recipes/download_shopping_cart/',
+        'shopping-cart-csv':
+            '/api/recipes/download_shopping_cart/?format=csv',
+        'ingredient-search': '/api/ingredients/?name=ингр',
+        'short-redirect': f'/s/{encode(recipe.pk)}',
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure queries, time and memory of the main endpoints on a '
+        'seeded test database and compare them with stored budgets'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=1.0,
+            help='Allowed relative overrun of time and memory budgets; '
+                 'query counts must not grow at all',
+        )
+        parser.add_argument('--budgets', default=str(BUDGETS_PATH))
+        parser.add_argument(
+            '--update-budgets',
+            action='store_true',
+            help='Store the measured values as the new budgets',
+        )
+        parser.add_argument('--users', type=int, default=DATASET['users'])
+        parser.add_argument(
+            '--recipes-per-user',
+            type=int,
+            default=DATASET['recipes_per_user'],
+        )
+        parser.add_argument('--seed', type=int, default=DATASET['seed'])
+
+    def handle(self, *args, **options):
+        dataset = {key: options[key] for key in DATASET}
+        setup_test_environment()
+        runner = DiscoverRunner(interactive=False, verbosity=0)
+        old_config = runner.setup_databases()
+        try:
+            with tempfile.TemporaryDirectory() as media_root:
+                with override_settings(
+                    MEDIA_ROOT=media_root, SHORTLINK_HITS=NO_HIT_FLUSH
+                ):
+                    results = self.run_benchmarks(
+                        dataset, options['repeat']
+                    )
+                    hits.buffer.flush()
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        path = Path(options['budgets'])
+        if options['update_budgets']:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(
+                {'dataset': dataset, 'endpoints': results},
+                indent=2,
+                ensure_ascii=False,
+            ) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Budgets written to {path}'))
+            return
+        if not path.exists():
+            raise CommandError(f'No budgets at {path}; run --update-budgets')
+        budgets = json.loads(path.read_text())
+        if budgets['dataset'] != dataset:
+            self.stderr.write(self.style.WARNING(
+                f'Budgets were recorded on {budgets["dataset"]}'
+            ))
+        failures = self.compare(
+            results, budgets['endpoints'], options['tolerance']
+        )
+        if failures:
+            raise CommandError(f'{failures} budget(s) exceeded')
+        self.stdout.write(self.style.SUCCESS('All endpoints within budget'))
+
+    def run_benchmarks(self, dataset: dict, repeat: int) -> dict:
+        Generator(
+            Config(prefix='bench', **dataset), log=lambda message: None
+        ).run()
+        user = User.objects.get(username='bench0')
+        recipe = Recipe.objects.order_by('-favorites_count', 'id').first()
+        token, _ = Token.objects.get_or_create(user=user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        cache.clear()
+        results = {}
+        for name, url in endpoints(user, recipe).items():
+            cold = self.measure(client, url)
+            runs = [self.measure(client, url) for _ in range(repeat)]
+            results[name] = {
+                'cold_queries': cold['queries'],
+                'queries': max(run['queries'] for run in runs),
+                'time_ms': round(
+                    statistics.median(run['time_ms'] for run in runs), 2
+                ),
+                'memory_kb': round(
+                    max(run['memory_kb'] for run in runs), 1
+                ),
+            }
+        return results
+
+    def measure(self, client: Client, url: str) -> dict:
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if response.status_code >= 400:
+            raise CommandError(f'{url} answered {response.status_code}')
+        return {
+            'queries': len(queries),
+            'time_ms': elapsed * 1000,
+            'memory_kb': peak / 1024,
+        }
+
+    def compare(self, results: dict, budgets: dict, tolerance: float) -> int:
+        failures = 0
+        self.stdout.write(
+            f'{"endpoint":<24}{"queries":>14}{"ms":>18}{"KiB":>20}'
+        )
+        for name, result in results.items():
+            budget = budgets.get(name)
+            if budget is None:
+                self.stdout.write(f'{name:<24} (no budget)')
+                continue
+            over = []
+            for metric in ('cold_queries', 'queries'):
+                if result[metric] > budget[metric]:
+                    over.append(metric)
+            for metric in ('time_ms', 'memory_kb'):
+                if result[metric] > budget[metric] * (1 + tolerance):
+                    over.append(metric)
+            line = (
+                f'{name:<24}'
+                f'{result["queries"]:>6}/{budget["queries"]:<7}'
+                f'{result["time_ms"]:>9.1f}/{budget["time_ms"]:<8.1f}'
+                f'{result["memory_kb"]:>10.0f}/{budget["memory_kb"]:<9.0f}'
+            )
+            if over:
+                failures += 1
+                self.stdout.write(self.style.ERROR(
+                    f'{line} over: {", ".join(over)}'
+                ))
+            else:
+                self.stdout.write(line)
+        return failures
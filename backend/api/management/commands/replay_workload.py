@@ -0,0 +1,295 @@
+"""Drive a running server with a weighted mix of user scenarios.
+
+Only the standard library is used on the client side (``urllib`` and
+threads), so the command can point at any deployment, e.g. the gunicorn
+container from ``infra/docker-compose.yml`` seeded with
+``generate_load_data``.
+"""
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from django.core.management.base import (
+    BaseCommand, CommandError, CommandParser,
+)
+
+from recipes.synthetic import PASSWORD
+
+DEFAULT_MIX = (
+    'browse=35,tags=15,detail=15,favorite=8,cart=7,'
+    'subscriptions=8,download=5,shortlink=7'
+)
+SCENARIOS = (
+    'browse', 'tags', 'detail', 'favorite', 'cart',
+    'subscriptions', 'download', 'shortlink',
+)
+PERCENTILES = (50, 90, 99)
+
+Call = Tuple[str, str, str]
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Session:
+    def __init__(self, base_url: str, timeout: float, token: str = None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = token
+        self.opener = urllib.request.build_opener(NoRedirect)
+
+    def request(self, method: str, path: str, data: dict = None):
+        """Return ``(status, body)``; HTTP errors are statuses, not raised."""
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method=method
+        )
+        request.add_header('Accept', 'application/json')
+        if body is not None:
+            request.add_header('Content-Type', 'application/json')
+        if self.token:
+            request.add_header('Authorization', f'Token {self.token}')
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+    def json(self, path: str):
+        status, body = self.request('GET', path)
+        if status != 200:
+            raise CommandError(f'GET {path} answered {status}')
+        return json.loads(body)
+
+
+class Catalog:
+    """Ids discovered on the server before the run starts."""
+
+    def __init__(self, session: Session):
+        page = session.json('/api/recipes/?limit=50')
+        self.recipe_ids = [recipe['id'] for recipe in page['results']]
+        if not self.recipe_ids:
+            raise CommandError('The server has no recipes; seed it first')
+        self.tags = [tag['slug'] for tag in session.json('/api/tags/')]
+        self.pages = max(1, page.get('count') or 1) // 6 or 1
+        self.short_paths = []
+        for recipe_id in self.recipe_ids[:10]:
+            link = session.json(f'/api/recipes/{recipe_id}/get-link/')
+            self.short_paths.append(
+                '/s/' + link['short-link'].rstrip('/').rsplit('/', 1)[1]
+            )
+
+
+def scenario_calls(name: str, catalog: Catalog, rng: random.Random):
+    """Return the ``(endpoint, method, path)`` calls of one scenario."""
+    recipe_id = rng.choice(catalog.recipe_ids)
+    if name == 'browse':
+        page = rng.randint(1, min(catalog.pages, 20))
+        return [('recipe-list', 'GET', f'/api/recipes/?page={page}')]
+    if name == 'tags':
+        tags = '&'.join(
+            f'tags={slug}'
+            for slug in rng.sample(catalog.tags, min(2, len(catalog.tags)))
+        )
+        return [('recipe-list-tags', 'GET', f'/api/recipes/?{tags}')]
+    if name == 'detail':
+        return [('recipe-detail', 'GET', f'/api/recipes/{recipe_id}/')]
+    if name in ('favorite', 'cart'):
+        action = 'favorite' if name == 'favorite' else 'shopping_cart'
+        path = f'/api/recipes/{recipe_id}/{action}/'
+        return [
+            (f'{name}-add', 'POST', path),
+            (f'{name}-remove', 'DELETE', path),
+        ]
+    if name == 'subscriptions':
+        return [(
+            'subscriptions',
+            'GET',
+            '/api/users/subscriptions/?recipes_limit=3',
+        )]
+    if name == 'download':
+        return [(
+            'shopping-cart',
+            'GET',
+            '/api/recipes/download_shopping_cart/',
+        )]
+    if name == 'shortlink':
+        return [('short-redirect', 'GET', rng.choice(catalog.short_paths))]
+    raise CommandError(f'Unknown scenario: {name}')
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise CommandError(
+                f'Unknown scenario "{name}"; choose from '
+                f'{", ".join(SCENARIOS)}'
+            )
+        try:
+            weights[name] = int(weight or 1)
+        except ValueError:
+            raise CommandError(f'Bad weight for "{name}": {weight}')
+        if weights[name] < 0:
+            raise CommandError(f'Negative weight for "{name}"')
+    if not sum(weights.values()):
+        raise CommandError('The mix needs at least one positive weight')
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = max(0, int(round(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Replay a mixed user workload against a running server'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--base-url', default='http://localhost')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--duration', type=float, default=30, help='Seconds to run'
+        )
+        parser.add_argument('--mix', default=DEFAULT_MIX)
+        parser.add_argument(
+            '--accounts',
+            type=int,
+            default=8,
+            help='Accounts to log in as (prefix0..prefixN-1)',
+        )
+        parser.add_argument('--prefix', default='load')
+        parser.add_argument('--password', default=PASSWORD)
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Write the JSON report here instead of stdout'
+        )
+
+    def handle(self, *args, **options):
+        weights = parse_mix(options['mix'])
+        base_url = options['base_url']
+        tokens = [
+            self.login(base_url, options, f'{options["prefix"]}{i}')
+            for i in range(options['accounts'])
+        ]
+        catalog = Catalog(Session(base_url, options['timeout'], tokens[0]))
+
+        samples: Dict[str, List[float]] = defaultdict(list)
+        statuses: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        lock = threading.Lock()
+        errors: List[BaseException] = []
+        deadline = time.monotonic() + options['duration']
+
+        def worker(number: int) -> None:
+            try:
+                run_worker(number)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+
+        def run_worker(number: int) -> None:
+            rng = random.Random(options['seed'] * 7919 + number)
+            session = Session(
+                base_url, options['timeout'], tokens[number % len(tokens)]
+            )
+            names, cum = list(weights), list(weights.values())
+            while time.monotonic() < deadline:
+                scenario = rng.choices(names, weights=cum)[0]
+                for endpoint, method, path in scenario_calls(
+                    scenario, catalog, rng
+                ):
+                    status, elapsed = self.timed(session, method, path)
+                    with lock:
+                        samples[endpoint].append(elapsed)
+                        statuses[endpoint][status] += 1
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=worker, args=(number,), daemon=True)
+            for number in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.monotonic() - started
+        if errors:
+            raise CommandError(
+                f'{len(errors)} of {len(threads)} workers failed; '
+                f'first error: {errors[0]!r}'
+            ) from errors[0]
+
+        report = self.report(samples, statuses, wall, options)
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(text + '\n')
+            self.stdout.write(self.style.SUCCESS(
+                f'{report["requests"]} requests, '
+                f'{report["throughput_rps"]} req/s; report written to '
+                f'{options["output"]}'
+            ))
+        else:
+            self.stdout.write(text)
+
+    def login(self, base_url: str, options: dict, username: str) -> str:
+        session = Session(base_url, options['timeout'])
+        status, body = session.request('POST', '/api/auth/token/login/', {
+            'email': f'{username}@example.com',
+            'password': options['password'],
+        })
+        if status != 200:
+            raise CommandError(f'Login as {username} failed with {status}')
+        return json.loads(body)['auth_token']
+
+    def timed(self, session: Session, method: str, path: str):
+        started = time.perf_counter()
+        try:
+            status, _ = session.request(method, path)
+            status = str(status)
+        except (OSError, urllib.error.URLError) as exc:
+            status = type(exc).__name__
+        return status, (time.perf_counter() - started) * 1000
+
+    def report(self, samples, statuses, wall: float, options) -> dict:
+        endpoints = {}
+        total = 0
+        for endpoint, values in sorted(samples.items()):
+            values.sort()
+            total += len(values)
+            codes = statuses[endpoint]
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'throughput_rps': round(len(values) / wall, 2),
+                'errors': sum(
+                    count for code, count in codes.items()
+                    if not code.isdigit() or int(code) >= 500
+                ),
+                'statuses': dict(codes),
+                **{
+                    f'p{pct}_ms': round(percentile(values, pct), 2)
+                    for pct in PERCENTILES
+                },
+                'max_ms': round(values[-1], 2),
+            }
+        return {
+            'base_url': options['base_url'],
+            'concurrency': options['concurrency'],
+            'mix': parse_mix(options['mix']),
+            'duration_s': round(wall, 2),
+            'requests': total,
+            'throughput_rps': round(total / wall, 2) if wall else 0,
+            'endpoints': endpoints,
+        }
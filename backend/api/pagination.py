@@ -1,9 +1,233 @@
-from rest_framework.pagination import PageNumberPagination
+from __future__ import annotations
+import hashlib
+import json
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage,
+    Page,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
 
 PAGE_SIZE_DEFAULT = 6
+CURSOR_PAGE_SIZE_MAX = 50
+COUNT_KEY_IGNORED_PARAMS = {'page', 'limit', 'cursor', 'recipes_limit'}
+COUNT_USER_SCOPED_PARAMS = {'is_favorited', 'is_in_shopping_cart'}
+
+
+class CountStrategy:
+    """Return ``(count, is_approximate)`` for a paginated queryset."""
+
+    def count(self, queryset: QuerySet, cache_key: str) -> Tuple[int, bool]:
+        raise NotImplementedError
+
+
+class ExactCount(CountStrategy):
+    def count(self, queryset, cache_key):
+        return queryset.count(), False
+
+
+class BoundedCount(CountStrategy):
+    """Count exactly up to ``EXACT_THRESHOLD`` rows, delegate above it.
+
+    The probe is ``COUNT(*)`` over a ``LIMIT threshold + 1`` subquery, so
+    it never touches more than ``threshold + 1`` rows.
+    """
+
+    def count(self, queryset, cache_key):
+        threshold = settings.PAGINATION_COUNT['EXACT_THRESHOLD']
+        probed = queryset.order_by().values('pk')[:threshold + 1].count()
+        if probed <= threshold:
+            return probed, False
+        return self.count_large(queryset, cache_key), True
+
+    def count_large(self, queryset: QuerySet, cache_key: str) -> int:
+        raise NotImplementedError
+
+
+class EstimatedCount(BoundedCount):
+    """Use the PostgreSQL planner row estimate for large results."""
+
+    def count_large(self, queryset, cache_key):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return queryset.count()
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCount(BoundedCount):
+    """Cache large exact counts for ``CACHE_TTL`` seconds."""
+
+    def count(self, queryset, cache_key):
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+        return super().count(queryset, cache_key)
+
+    def count_large(self, queryset, cache_key):
+        value = queryset.count()
+        cache.set(
+            cache_key, value, settings.PAGINATION_COUNT['CACHE_TTL']
+        )
+        return value
+
+
+COUNT_STRATEGIES = {
+    'exact': ExactCount,
+    'estimate': EstimatedCount,
+    'cached': CachedCount,
+}
+
+
+class ApproximatePage(Page):
+    def __init__(self, object_list, number, paginator, has_more: bool):
+        super().__init__(object_list, number, paginator)
+        self._has_more = has_more
+
+    def has_next(self) -> bool:
+        return self._has_more
+
+    # The approximate count may be below the real one, so neighbouring
+    # page numbers must not be validated against it.
+    def next_page_number(self) -> int:
+        return self.number + 1
+
+    def previous_page_number(self) -> int:
+        return self.number - 1
+
+
+class CountStrategyPaginator(Paginator):
+    """Django paginator whose ``count`` comes from a ``CountStrategy``.
+
+    When the count is approximate, pages are sliced without trusting it:
+    one extra row is fetched to decide whether a next page exists.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        strategy: Optional[CountStrategy] = None,
+        cache_key: str = '',
+        **kwargs,
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.strategy = strategy
+        self.cache_key = cache_key
+        self.count_is_approximate = False
+
+    @cached_property
+    def count(self) -> int:
+        if self.strategy is None or not isinstance(
+            self.object_list, QuerySet
+        ):
+            return super().count
+        value, self.count_is_approximate = self.strategy.count(
+            self.object_list, self.cache_key
+        )
+        return value
+
+    def page(self, number):
+        # Resolving ``count`` also sets ``count_is_approximate``.
+        self.count
+        if not self.count_is_approximate:
+            return super().page(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return ApproximatePage(
+            rows[:self.per_page],
+            number,
+            self,
+            has_more=len(rows) > self.per_page,
+        )
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_query_param = 'page'
     page_size_query_param = 'limit'
     page_size = PAGE_SIZE_DEFAULT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        strategy = COUNT_STRATEGIES[
+            settings.PAGINATION_COUNT['STRATEGY']
+        ]()
+        cache_key = self.get_count_cache_key(request, view)
+        self.django_paginator_class = (
+            lambda object_list, per_page: CountStrategyPaginator(
+                object_list, per_page, strategy, cache_key,
+            )
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_cache_key(self, request, view=None) -> str:
+        """Key counts by path and normalized filter parameters.
+
+        Views whose querysets do not depend on the user set
+        ``count_shared = True``; everything else is keyed per user.
+        """
+        params = sorted(
+            (key, sorted(request.query_params.getlist(key)))
+            for key in request.query_params
+            if key not in COUNT_KEY_IGNORED_PARAMS
+        )
+        shared = getattr(view, 'count_shared', False) and not (
+            COUNT_USER_SCOPED_PARAMS & set(request.query_params)
+        )
+        scope = 'shared' if shared else f'user:{request.user.pk}'
+        digest = hashlib.md5(
+            json.dumps([request.path, scope, params]).encode()
+        ).hexdigest()
+        return f'pagination-count:{digest}'
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_approximate': self.page.paginator.count_is_approximate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return response_schema
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination over ``(created_at, id)`` for infinite scroll.
+
+    No ``COUNT(*)`` is issued and deep pages do not scan skipped rows:
+    the cursor encodes the last seen ``created_at`` and the query seeks
+    past it using ``recipe_created_at_id_idx``.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = PAGE_SIZE_DEFAULT
+    max_page_size = CURSOR_PAGE_SIZE_MAX
+    ordering = ('-created_at', '-id')
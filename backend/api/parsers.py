@@ -0,0 +1,15 @@
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework.parsers import MultiPartParser
+
+
+class DiskMultiPartParser(MultiPartParser):
+    """Multipart parser that always spools files to a temporary file.
+
+    Django keeps uploads under ``FILE_UPLOAD_MAX_MEMORY_SIZE`` in memory;
+    here every file is written to disk chunk by chunk as it arrives.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']._request
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,40 @@
+import json
+
+from rest_framework import renderers
+
+from .instrumentation import stage
+
+
+class TimedRendererMixin:
+    """Report rendering as the ``render`` timing stage."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with stage('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class JSONRenderer(TimedRendererMixin, renderers.JSONRenderer):
+    pass
+
+
+class BrowsableAPIRenderer(
+    TimedRendererMixin, renderers.BrowsableAPIRenderer
+):
+    pass
+
+
+class PlainTextRenderer(renderers.BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with stage('render'):
+            if isinstance(data, str):
+                return data.encode(self.charset)
+            return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+
+class CSVRenderer(PlainTextRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
@@ -1,8 +1,14 @@
 from __future__ import annotations
+import uuid
 from typing import List
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
+from recipes.counters import adjust, recipe_added
+from recipes.images import variant_urls
 from recipes.models import (
 	Tag,
 	Ingredient,
@@ -10,18 +16,58 @@ from recipes.models import (
 	RecipeIngredient,
 	Favorite,   
 	ShoppingCart,
+	ShoppingListItem,
 )
+from jobs.models import Job
+from uploads.images import EXTENSIONS, inspect
+from uploads.models import Upload
 from users.models import User
 from .fields import Base64ImageField
+from .fragments import get_fragments
+from .instrumentation import stage
+from .loaders import get_loader
 
+RECIPE_READ_PREFETCH = ('tags', 'recipe_ingredients__ingredient')
+JOB_ERROR_MESSAGE = 'Задача завершилась с ошибкой.'
 
-class TagSerializer(serializers.ModelSerializer):
+
+class TimedSerializerMixin:
+    """Report serialization as the ``serialize`` timing stage.
+
+    ``data`` covers serializers that override ``to_representation``
+    without calling ``super()``; ``to_representation`` covers rows
+    serialized by a plain ``ListSerializer``.
+    """
+
+    @property
+    def data(self):
+        with stage('serialize'):
+            return super().data
+
+    def to_representation(self, instance):
+        with stage('serialize'):
+            return super().to_representation(instance)
+
+
+class BatchingListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """Let the child prime its batch loaders before rows are serialized."""
+
+    def to_representation(self, data):
+        iterable = data.all() if hasattr(data, 'all') else data
+        items = list(iterable)
+        prime = getattr(self.child, 'prime', None)
+        if prime is not None:
+            prime(items)
+        return [self.child.to_representation(item) for item in items]
+
+
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ('id', 'name', 'slug')
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Ingredient
         fields = ('id', 'name', 'measurement_unit')
@@ -34,10 +80,97 @@ class IngredientInRecipeSerializer(serializers.Serializer):
     amount = serializers.IntegerField()
 
 
-class RecipeMinifiedSerializer(serializers.ModelSerializer):
+class ShoppingListItemSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    id = serializers.IntegerField(source='ingredient_id', read_only=True)
+    name = serializers.CharField(source='ingredient.name', read_only=True)
+    measurement_unit = serializers.CharField(
+        source='ingredient.measurement_unit',
+        read_only=True,
+    )
+
+    class Meta:
+        model = ShoppingListItem
+        fields = ('id', 'name', 'measurement_unit', 'amount', 'recipes_count')
+
+
+class JobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Tracebacks carry paths, SQL and settings; only staff see them.
+    last_error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = (
+            'id',
+            'name',
+            'status',
+            'attempts',
+            'max_attempts',
+            'run_after',
+            'last_error',
+            'created_at',
+            'updated_at',
+        )
+        read_only_fields = fields
+
+    def get_last_error(self, obj: Job) -> str:
+        request = self.context.get('request')
+        if not obj.last_error or (request and request.user.is_staff):
+            return obj.last_error
+        return JOB_ERROR_MESSAGE
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True)
+
+    class Meta:
+        model = Upload
+        fields = (
+            'token',
+            'file',
+            'format',
+            'width',
+            'height',
+            'size',
+            'created_at',
+        )
+        read_only_fields = (
+            'token', 'format', 'width', 'height', 'size', 'created_at'
+        )
+
+    def validate(self, attrs):
+        file = attrs['file']
+        if file.size > settings.UPLOADS['MAX_SIZE']:
+            raise serializers.ValidationError(
+                {'file': ['Файл слишком большой.']}
+            )
+        try:
+            info = inspect(file)
+        except ValueError:
+            raise serializers.ValidationError(
+                {'file': ['Загрузите корректное изображение.']}
+            )
+        file.name = f'{uuid.uuid4().hex}.{EXTENSIONS[info.format]}'
+        attrs.update(info._asdict(), size=file.size)
+        return attrs
+
+
+class AvatarSerializer(serializers.Serializer):
+    avatar = Base64ImageField()
+
+
+class RecipeMinifiedSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
+
+    def get_image_variants(self, obj: Recipe) -> dict | None:
+        return variant_urls(obj.image, self.context.get('request'))
 
 
 class RecipeIngredientReadSerializer(serializers.ModelSerializer):
@@ -56,9 +189,10 @@ class RecipeIngredientReadSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
     avatar = serializers.SerializerMethodField(read_only=True)
+    avatar_variants = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = User
@@ -70,13 +204,18 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name',
             'is_subscribed',
             'avatar',
+            'avatar_variants',
         )
+        list_serializer_class = BatchingListSerializer
+
+    def prime(self, users: List[User]) -> None:
+        loader = get_loader(self.context.get('request'), 'is_subscribed')
+        if loader is not None:
+            loader.prime(user.id for user in users)
 
     def get_is_subscribed(self, obj: User) -> bool:
-        request = self.context.get('request')
-        if not request or request.user.is_anonymous:
-            return False
-        return obj.subscribers.filter(user=request.user).exists()
+        loader = get_loader(self.context.get('request'), 'is_subscribed')
+        return bool(loader and loader.load(obj.id))
 
     def get_avatar(self, obj: User) -> str | None:
         if not obj.avatar:
@@ -87,6 +226,9 @@ class UserSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(url)
         return url
 
+    def get_avatar_variants(self, obj: User) -> dict | None:
+        return variant_urls(obj.avatar, self.context.get('request'))
+
 
 class UserCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -109,10 +251,12 @@ class UserWithRecipesSerializer(UserSerializer):
         fields = UserSerializer.Meta.fields + ('recipes', 'recipes_count')
 
     def get_recipes(self, obj: User):
-        recipes_qs = obj.recipes.all().order_by('-created_at', '-id')
-        limit = self.context.get('recipes_limit')
-        if isinstance(limit, int):
-            recipes_qs = recipes_qs[:limit]
+        recipes_qs = getattr(obj, 'latest_recipes', None)
+        if recipes_qs is None:
+            recipes_qs = obj.recipes.all().order_by('-created_at', '-id')
+            limit = self.context.get('recipes_limit')
+            if isinstance(limit, int):
+                recipes_qs = recipes_qs[:limit]
         request = self.context.get('request')
         result = []
         for r in recipes_qs:
@@ -123,15 +267,16 @@ class UserWithRecipesSerializer(UserSerializer):
                 'id': r.id,
                 'name': r.name,
                 'image': image_url,
+                'image_variants': variant_urls(r.image, request),
                 'cooking_time': r.cooking_time,
             })
         return result
 
     def get_recipes_count(self, obj: User) -> int:
-        return obj.recipes.count()
+        return obj.recipes_count
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class RecipeReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
     ingredients = RecipeIngredientReadSerializer(
@@ -141,6 +286,7 @@ class RecipeReadSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -153,28 +299,72 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
             'cooking_time',
         )
+        list_serializer_class = BatchingListSerializer
+
+    def prime(self, recipes: List[Recipe]) -> None:
+        request = self.context.get('request')
+        fragments = get_fragments(request)
+        if fragments is not None:
+            missed = fragments.prime(recipes)
+            prefetch_related_objects(missed, *RECIPE_READ_PREFETCH)
+        loader = get_loader(request, 'is_subscribed')
+        if loader is None:
+            return
+        loader.prime(recipe.author_id for recipe in recipes)
+        for flag in ('is_favorited', 'is_in_shopping_cart'):
+            get_loader(request, flag).prime(
+                recipe.id for recipe in recipes
+                if getattr(recipe, flag, None) is None
+            )
+
+    def to_representation(self, instance: Recipe):
+        fragments = get_fragments(self.context.get('request'))
+        if fragments is None:
+            return super().to_representation(instance)
+        fragment = fragments.get(instance)
+        if fragment is None:
+            prefetch_related_objects([instance], *RECIPE_READ_PREFETCH)
+            fragment = super().to_representation(instance)
+            fragment['author']['is_subscribed'] = False
+            fragment['is_favorited'] = False
+            fragment['is_in_shopping_cart'] = False
+            fragments.put(instance, fragment)
+        return self._with_user_flags(fragment, instance)
+
+    def _with_user_flags(self, fragment: dict, instance: Recipe) -> dict:
+        loader = get_loader(self.context.get('request'), 'is_subscribed')
+        data = dict(fragment)
+        data['author'] = dict(fragment['author'])
+        data['author']['is_subscribed'] = bool(
+            loader and loader.load(instance.author_id)
+        )
+        data['is_favorited'] = self.get_is_favorited(instance)
+        data['is_in_shopping_cart'] = self.get_is_in_shopping_cart(instance)
+        return data
+
+    def get_image_variants(self, obj: Recipe) -> dict | None:
+        return variant_urls(obj.image, self.context.get('request'))
 
     def get_author(self, obj: Recipe):
         return UserSerializer(obj.author, context=self.context).data
 
     def get_is_favorited(self, obj: Recipe) -> bool:
-        request = self.context.get('request')
-        return bool(
-            request
-            and not request.user.is_anonymous
-            and obj.favorited_by.filter(user=request.user).exists()
-        )
+        annotated = getattr(obj, 'is_favorited', None)
+        if annotated is not None:
+            return annotated
+        loader = get_loader(self.context.get('request'), 'is_favorited')
+        return bool(loader and loader.load(obj.id))
 
     def get_is_in_shopping_cart(self, obj: Recipe) -> bool:
-        request = self.context.get('request')
-        return bool(
-            request
-            and not request.user.is_anonymous
-            and obj.in_carts.filter(user=request.user).exists()
-        )
+        annotated = getattr(obj, 'is_in_shopping_cart', None)
+        if annotated is not None:
+            return annotated
+        loader = get_loader(self.context.get('request'), 'is_in_shopping_cart')
+        return bool(loader and loader.load(obj.id))
 
 
 class RecipeWriteIngredientSerializer(serializers.Serializer):
@@ -233,6 +423,7 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             )
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients', [])
         tag_ids: List[int] = validated_data.pop('tags', [])
@@ -242,6 +433,7 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         )
         recipe.tags.set(tag_ids)
         self._set_ingredients(recipe, ingredients_data)
+        recipe_added(recipe)
         return recipe
 
     def update(self, instance: Recipe, validated_data):
@@ -274,7 +466,9 @@ class FavoriteActionSerializer(serializers.Serializer):
 		recipe = self.context['recipe']
 		if Favorite.objects.filter(user=request.user, recipe=recipe).exists():
 			raise serializers.ValidationError({'errors': 'Рецепт уже в избранном'})
-		Favorite.objects.create(user=request.user, recipe=recipe)
+		with transaction.atomic():
+			Favorite.objects.create(user=request.user, recipe=recipe)
+			adjust(Recipe, recipe.pk, favorites_count=1)
 		return recipe
 
 	def to_representation(self, instance):
@@ -291,7 +485,9 @@ class ShoppingCartActionSerializer(serializers.Serializer):
 		recipe = self.context['recipe']
 		if ShoppingCart.objects.filter(user=request.user, recipe=recipe).exists():
 			raise serializers.ValidationError({'errors': 'Рецепт уже в списке покупок'})
-		ShoppingCart.objects.create(user=request.user, recipe=recipe)
+		with transaction.atomic():
+			ShoppingCart.objects.create(user=request.user, recipe=recipe)
+			adjust(Recipe, recipe.pk, in_carts_count=1)
 		return recipe
 
 	def to_representation(self, instance):
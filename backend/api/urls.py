@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    RecipeViewSet, UserViewSet,
+    JobViewSet, RecipeViewSet, UserViewSet,
+    cache_stats, create_upload,
     list_tags, get_tag,
     list_ingredients, get_ingredient,
 )
@@ -9,11 +10,14 @@ from .views import (
 router = DefaultRouter()
 router.register(r'recipes', RecipeViewSet, basename='recipes')
 router.register(r'users', UserViewSet, basename='users')
+router.register(r'jobs', JobViewSet, basename='jobs')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
+    path('cache-stats/', cache_stats),
+    path('uploads/', create_upload),
     path('tags/', list_tags),
     path('tags/<int:id>/', get_tag),
     path('ingredients/', list_ingredients),
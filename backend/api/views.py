@@ -1,24 +1,48 @@
 from __future__ import annotations
+import json
 
 from django.contrib.auth import get_user_model
-from django.db.models import Sum, Max
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import (
+    Exists,
+    OuterRef,
+    Prefetch,
+    Value,
+    prefetch_related_objects,
+)
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 from rest_framework import viewsets, permissions, status, decorators
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view, parser_classes, permission_classes,
+)
 from rest_framework.response import Response
 
 from .filters import RecipesFilterBackend
-from .pagination import StandardResultsSetPagination
+from .loaders import get_loader
+from . import (
+    catalog,
+    conditional,
+    fragments,
+    ingredient_index,
+    shopping_export,
+)
+from .parsers import DiskMultiPartParser
+from .pagination import RecipeCursorPagination, StandardResultsSetPagination
 from .permissions import IsAuthorOrReadOnly
+from .renderers import CSVRenderer, JSONRenderer, PlainTextRenderer
 from .serializers import (
     RecipeReadSerializer,
     RecipeCreateUpdateSerializer,
     TagSerializer,
     IngredientSerializer,
+    JobSerializer,
+    UploadSerializer,
+    AvatarSerializer,
     FavoriteActionSerializer,
     ShoppingCartActionSerializer,
+    ShoppingListItemSerializer,
     UserSerializer,
     UserWithRecipesSerializer,
 )
@@ -30,22 +54,91 @@ from recipes.models import (
     RecipeShortLink,
     Tag,
     Ingredient,
-    RecipeIngredient,
+    ShoppingListItem,
 )
+from jobs.models import Job
+from recipes.counters import adjust, recipe_removed
+from shortlinks import codes as shortlink_codes
 from users.models import Subscription
 
 User = get_user_model()
 
+INGREDIENT_DUMP_CHUNK_SIZE = 2000
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = (
         Recipe.objects.all()
         .select_related('author')
-        .prefetch_related('tags', 'recipe_ingredients__ingredient')
+        .order_by('-created_at', '-id')
     )
     permission_classes = [IsAuthorOrReadOnly]
     pagination_class = StandardResultsSetPagination
     filter_backends = [RecipesFilterBackend]
+    count_shared = True
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and RecipeCursorPagination.cursor_query_param
+            in self.request.query_params
+        ):
+            self._paginator = RecipeCursorPagination()
+        return super().paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+            )
+        return queryset.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        counted = getattr(self.paginator, 'page', None)
+        etag = conditional.make_etag(
+            request.get_full_path(),
+            conditional.get_user_version(request.user),
+            catalog.get_version(),
+            counted.paginator.count if hasattr(counted, 'paginator') else None,
+            [(row.id, row.updated_at) for row in rows],
+        )
+        response = conditional.not_modified(request, etag)
+        if response is None:
+            serializer = self.get_serializer(rows, many=True)
+            if page is None:
+                response = Response(serializer.data)
+            else:
+                response = self.get_paginated_response(serializer.data)
+        response['ETag'] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = conditional.make_etag(
+            request.path,
+            conditional.get_user_version(request.user),
+            catalog.get_version(),
+            instance.updated_at,
+        )
+        response = conditional.not_modified(request, etag)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        response['ETag'] = etag
+        return response
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
@@ -59,6 +152,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
             'favorite',
             'shopping_cart',
             'download_shopping_cart',
+            'shopping_cart_summary',
         ]:
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
@@ -66,6 +160,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save()
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        author_id = instance.author_id
+        instance.delete()
+        recipe_removed(author_id)
+
     def _add_relation(self, request, recipe, serializer_class):
         serializer = serializer_class(
             data=request.data,
@@ -75,12 +175,17 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    def _remove_relation(self, model, request, recipe, not_found_error: str):
+    @transaction.atomic
+    def _remove_relation(
+        self, model, request, recipe, not_found_error: str, counter: str
+    ):
         deleted, _ = model.objects.filter(
             user=request.user,
             recipe=recipe,
         ).delete()
-        if not deleted:
+        if deleted:
+            adjust(Recipe, recipe.pk, **{counter: -1})
+        else:
             return Response(
                 {'errors': not_found_error},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -97,7 +202,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 FavoriteActionSerializer,
             )
         return self._remove_relation(
-            Favorite, request, recipe, 'Рецепта не было в избранном'
+            Favorite, request, recipe, 'Рецепта не было в избранном',
+            'favorites_count',
         )
 
     @decorators.action(detail=True, methods=['post', 'delete'])
@@ -108,88 +214,159 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 request, recipe, ShoppingCartActionSerializer
             )
         return self._remove_relation(
-            ShoppingCart, request, recipe, 'Рецепта не было в списке покупок'
+            ShoppingCart, request, recipe, 'Рецепта не было в списке покупок',
+            'in_carts_count',
         )
 
-    @decorators.action(detail=False, methods=['get'])
-    def download_shopping_cart(self, request):
-        agg = (
-            RecipeIngredient.objects
-            .filter(recipe__in_carts__user=request.user)
-            .values('ingredient__name', 'ingredient__measurement_unit')
-            .annotate(total=Sum('amount'))
+    def _shopping_list(self, request):
+        return (
+            ShoppingListItem.objects
+            .filter(user=request.user)
+            .select_related('ingredient')
             .order_by('ingredient__name')
         )
-        lines = [
-            "{name} ({unit}) — {total}".format(
-                name=row['ingredient__name'],
-                unit=row['ingredient__measurement_unit'],
-                total=row['total'],
-            )
-            for row in agg
-        ]
-        content = "\n".join(lines) or "Список покупок пуст."
-        response = HttpResponse(
-            content,
-            content_type='text/plain; charset=utf-8',
-        )
-        response['Content-Disposition'] = (
-            'attachment; filename="shopping-list.txt"'
+
+    @decorators.action(
+        detail=False,
+        methods=['get'],
+        renderer_classes=[PlainTextRenderer, CSVRenderer, JSONRenderer],
+    )
+    def download_shopping_cart(self, request):
+        """Export the list as ``?format=txt`` (default), csv or json."""
+        return shopping_export.export(
+            request.user, request.accepted_renderer.format
         )
-        return response
+
+    @decorators.action(detail=False, methods=['get'])
+    def shopping_cart_summary(self, request):
+        return Response(ShoppingListItemSerializer(
+            self._shopping_list(request), many=True
+        ).data)
 
     @decorators.action(detail=True, methods=['get'], url_path='get-link')
     def get_link(self, request, pk=None):
         recipe = self.get_object()
-        link, _ = RecipeShortLink.objects.get_or_create(recipe=recipe)
-        if not link.code:
-            import secrets
-            import string
-            alphabet = string.ascii_letters + string.digits
-            link.code = ''.join(
-                secrets.choice(alphabet) for _ in range(4)
-            )
-            link.save(update_fields=['code'])
+        link, _ = RecipeShortLink.objects.get_or_create(
+            recipe=recipe,
+            defaults={'code': shortlink_codes.encode(recipe.pk)},
+        )
         absolute = request.build_absolute_uri(f"/s/{link.code}")
         return Response({"short-link": absolute})
 
 
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status of the caller's background jobs; staff see every job."""
+
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Job.objects.order_by('-created_at', '-id')
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(user=self.request.user)
+
+
+@api_view(['POST'])
+@parser_classes([DiskMultiPartParser])
+@permission_classes([permissions.IsAuthenticated])
+def create_upload(request):
+    """Store a multipart image and return the token that refers to it."""
+    serializer = UploadSerializer(
+        data=request.data, context={'request': request}
+    )
+    serializer.is_valid(raise_exception=True)
+    serializer.save(user=request.user)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cache_stats(request):
+    return Response({'recipe_fragments': fragments.stats.as_dict()})
+
+
+@catalog.conditional
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def list_tags(request):
-    return Response(
-        TagSerializer(
-            Tag.objects.all(), many=True, context={'request': request}
-        ).data
-    )
+    return Response(catalog.get_or_build(
+        'tags',
+        lambda: TagSerializer(Tag.objects.all(), many=True).data,
+    ))
 
 
+@catalog.conditional
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_tag(request, id: int):
-    tag = get_object_or_404(Tag, id=id)
-    return Response(TagSerializer(tag, context={'request': request}).data)
+    return Response(catalog.get_or_build(
+        f'tag:{id}',
+        lambda: TagSerializer(get_object_or_404(Tag, id=id)).data,
+    ))
+
+
+def _stream_ingredients():
+    yield '['
+    rows = (
+        Ingredient.objects
+        .order_by('id')
+        .values('id', 'name', 'measurement_unit')
+        .iterator(chunk_size=INGREDIENT_DUMP_CHUNK_SIZE)
+    )
+    for number, row in enumerate(rows):
+        yield (',' if number else '') + json.dumps(row, ensure_ascii=False)
+    yield ']'
 
 
+@catalog.conditional
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def list_ingredients(request):
+    """List ingredients in one of three modes.
+
+    ``?limit=`` (with optional ``offset``) returns a bounded page from the
+    in-memory index, ``?dump=1`` streams the whole catalog straight from a
+    database cursor; without either the legacy full list is returned.
+    """
     name = request.query_params.get('name', '')
-    qs = Ingredient.objects.all()
+    limit = request.query_params.get('limit', '')
+    offset = request.query_params.get('offset', '')
+    if limit.isdigit():
+        return Response(ingredient_index.search(
+            name,
+            limit=int(limit),
+            offset=int(offset) if offset.isdigit() else 0,
+        ))
     if name:
-        qs = qs.filter(name__istartswith=name)
-    return Response(
-        IngredientSerializer(qs, many=True, context={'request': request}).data
+        return Response(ingredient_index.search(name))
+    if request.query_params.get('dump') == '1':
+        return StreamingHttpResponse(
+            _stream_ingredients(),
+            content_type='application/json',
+        )
+    return Response(_all_ingredients())
+
+
+def _all_ingredients():
+    return catalog.get_or_build(
+        'ingredients',
+        lambda: IngredientSerializer(Ingredient.objects.all(), many=True).data,
     )
 
 
+@catalog.conditional
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_ingredient(request, id: int):
-    ingredient = get_object_or_404(Ingredient, id=id)
-    return Response(
-        IngredientSerializer(ingredient, context={'request': request}).data
+    # One map per catalog version instead of one cache entry per id.
+    ingredients = catalog.get_or_build(
+        'ingredients-by-id',
+        lambda: {row['id']: row for row in _all_ingredients()},
     )
+    if id not in ingredients:
+        raise Http404
+    return Response(ingredients[id])
 
 
 class UserViewSet(viewsets.ViewSet):
@@ -214,20 +391,36 @@ class UserViewSet(viewsets.ViewSet):
             .filter(user=request.user)
             .values('author_id')
         )
-        qs = qs.annotate(
-            last_pub=Max('recipes__created_at')
-        ).order_by('-last_pub', '-id')
+        qs = qs.order_by('-last_recipe_at', '-id')
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = self._authors_with_recipes(request, page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def _authors_with_recipes(self, request, authors, many=False):
+        """Serialize subscribed ``authors`` with a constant query count.
 
+        The latest ``recipes_limit`` recipes of every author are fetched by
+        one windowed prefetch; ``recipes_count`` is a stored counter.
+        """
         recipes_limit = request.query_params.get('recipes_limit')
-        ctx = {'request': request}
+        recipes = Recipe.objects.order_by('-created_at', '-id')
         if recipes_limit and recipes_limit.isdigit():
-            ctx['recipes_limit'] = int(recipes_limit)
-
-        serializer = UserWithRecipesSerializer(page, many=True, context=ctx)
-        return paginator.get_paginated_response(serializer.data)
+            recipes = recipes[:int(recipes_limit)]
+        authors = authors if many else [authors]
+        prefetch_related_objects(
+            authors,
+            Prefetch('recipes', queryset=recipes, to_attr='latest_recipes'),
+        )
+        get_loader(request, 'is_subscribed').prime_values(
+            dict.fromkeys((author.id for author in authors), True)
+        )
+        return UserWithRecipesSerializer(
+            authors if many else authors[0],
+            many=many,
+            context={'request': request},
+        )
 
     @decorators.action(
         detail=True,
@@ -242,27 +435,28 @@ class UserViewSet(viewsets.ViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             author = get_object_or_404(User, id=pk)
-            obj, created = Subscription.objects.get_or_create(
-                user=request.user,
-                author=author,
-            )
+            with transaction.atomic():
+                obj, created = Subscription.objects.get_or_create(
+                    user=request.user,
+                    author=author,
+                )
+                if created:
+                    adjust(User, author.pk, subscribers_count=1)
             if not created:
                 return Response(
                     {'errors': 'Уже подписаны'},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-
-            recipes_limit = request.query_params.get('recipes_limit')
-            ctx = {'request': request}
-            if recipes_limit and recipes_limit.isdigit():
-                ctx['recipes_limit'] = int(recipes_limit)
-            serializer = UserWithRecipesSerializer(author, context=ctx)
+            serializer = self._authors_with_recipes(request, author)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        deleted, _ = Subscription.objects.filter(
-            user=request.user,
-            author_id=pk,
-        ).delete()
+        with transaction.atomic():
+            deleted, _ = Subscription.objects.filter(
+                user=request.user,
+                author_id=pk,
+            ).delete()
+            if deleted:
+                adjust(User, pk, subscribers_count=-1)
         if not deleted:
             return Response(
                 {'errors': 'Не были подписаны'},
@@ -278,13 +472,18 @@ class UserViewSet(viewsets.ViewSet):
     )
     def avatar(self, request):
         if request.method.lower() == 'put':
-            avatar_b64 = request.data.get('avatar')
-            if not avatar_b64:
+            # A base64 data URI or the token of an earlier upload.
+            avatar = request.data.get('avatar')
+            if not avatar:
                 return Response(
                     {'avatar': ['Обязательное поле.']},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            file = Base64ImageField().to_internal_value(avatar_b64)
+            serializer = AvatarSerializer(
+                data=request.data, context={'request': request}
+            )
+            serializer.is_valid(raise_exception=True)
+            file = serializer.validated_data['avatar']
             user = request.user
             user.avatar.save(file.name, file, save=True)
             url = request.build_absolute_uri(user.avatar.url)
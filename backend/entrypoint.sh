@@ -31,7 +31,16 @@ PY
   done
 fi
 
+# Seen by the api.E001 system check, which every management command
+# (migrate, run_jobs) runs before starting.
+export GUNICORN_WORKERS="${GUNICORN_WORKERS:-3}"
+
+# Any other command (e.g. the job worker) runs as is, without migrations.
+if [ "$#" -gt 0 ]; then
+  exec "$@"
+fi
+
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput
 
-exec gunicorn foodgram_backend.wsgi:application --bind 0.0.0.0:8000 --workers ${GUNICORN_WORKERS:-3}
+exec gunicorn foodgram_backend.wsgi:application --bind 0.0.0.0:8000 --workers "$GUNICORN_WORKERS"
@@ -23,9 +23,12 @@ INSTALLED_APPS = [
     'users',
     'recipes',
     'shortlinks',
+    'jobs',
+    'uploads',
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,13 +87,48 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'uploads.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Unreferenced content-addressed files younger than this are kept: the
+# row that will reference them may not be committed yet.
+MEDIA_GC_GRACE = int(os.getenv('MEDIA_GC_GRACE', '86400'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Catalog, fragment, ETag and shopping list versions live in the cache and
+# must be shared by every worker and management command; the api.E001
+# check rejects a per-process cache when gunicorn runs several workers.
+REDIS_URL = os.getenv('REDIS_URL', '')
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.redis.RedisCache' if REDIS_URL
+            else 'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv(
+            'DJANGO_CACHE_LOCATION', REDIS_URL or 'foodgram'
+        ),
+    }
+}
+
 AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.TokenAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.JSONRenderer',
+        'api.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -100,6 +138,55 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 6,
 }
 
+PAGINATION_COUNT = {
+    'STRATEGY': os.getenv('PAGINATION_COUNT_STRATEGY', 'cached'),
+    'EXACT_THRESHOLD': int(os.getenv('PAGINATION_COUNT_EXACT_THRESHOLD', '1000')),
+    'CACHE_TTL': int(os.getenv('PAGINATION_COUNT_CACHE_TTL', '60')),
+}
+
+RECIPE_FRAGMENT_CACHE = {
+    'TTL': int(os.getenv('RECIPE_FRAGMENT_CACHE_TTL', '600')),
+}
+
+INGREDIENT_SEARCH = {
+    'MAX_RESULTS': int(os.getenv('INGREDIENT_SEARCH_MAX_RESULTS', '50')),
+}
+
+IMAGE_VARIANTS = {
+    'SIZES': {'small': 320, 'medium': 640},
+    'QUALITY': int(os.getenv('IMAGE_VARIANTS_QUALITY', '80')),
+}
+
+JOBS = {
+    'POLL_INTERVAL': float(os.getenv('JOBS_POLL_INTERVAL', '1')),
+    'RETRY_DELAY': int(os.getenv('JOBS_RETRY_DELAY', '10')),
+    'STALE_AFTER': int(os.getenv('JOBS_STALE_AFTER', '600')),
+    # Must stay well below STALE_AFTER.
+    'HEARTBEAT_INTERVAL': int(os.getenv('JOBS_HEARTBEAT_INTERVAL', '60')),
+}
+
+UPLOADS = {
+    'MAX_SIZE': int(os.getenv('UPLOADS_MAX_SIZE', str(10 * 1024 * 1024))),
+    'MAX_PIXELS': int(os.getenv('UPLOADS_MAX_PIXELS', '40000000')),
+    'TTL': int(os.getenv('UPLOADS_TTL', '86400')),
+}
+
+INSTRUMENTATION = {
+    'SAMPLE_RATE': float(os.getenv('INSTRUMENTATION_SAMPLE_RATE', '0.1')),
+    'SLOW_REQUEST_MS': int(os.getenv('SLOW_REQUEST_MS', '500')),
+    # Requests with a matching X-Debug-Token header are always profiled
+    # and get a Server-Timing header; empty disables the token.
+    'DEBUG_TOKEN': os.getenv('INSTRUMENTATION_DEBUG_TOKEN', ''),
+    'DUPLICATE_THRESHOLD': int(
+        os.getenv('INSTRUMENTATION_DUPLICATE_THRESHOLD', '3')
+    ),
+}
+
+SHORTLINK_HITS = {
+    'FLUSH_THRESHOLD': int(os.getenv('SHORTLINK_HITS_FLUSH_THRESHOLD', '100')),
+    'FLUSH_INTERVAL': int(os.getenv('SHORTLINK_HITS_FLUSH_INTERVAL', '10')),
+}
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Foodgram',
     'VERSION': '1.0.0',
@@ -0,0 +1,39 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from jobs.worker import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the due jobs and exit instead of polling',
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        total = 0
+        while not self.stopping:
+            close_old_connections()
+            done = run_pending(options['batch_size'])
+            total += done
+            if done:
+                continue
+            if options['once']:
+                break
+            time.sleep(settings.JOBS['POLL_INTERVAL'])
+        self.stdout.write(self.style.SUCCESS(f'Ran {total} jobs'))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,64 @@
+"""Task registry and the ``enqueue`` entry point.
+
+A task is a plain function taking the job payload as keyword arguments,
+registered with ``@task``. Apps register their tasks by importing their
+``tasks`` module in ``AppConfig.ready``, so the web process and the
+``run_jobs`` worker see the same registry.
+"""
+from __future__ import annotations
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+class Task:
+    def __init__(self, func: Callable, name: str, max_attempts: int):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, **payload):
+        return self.func(**payload)
+
+
+registry: Dict[str, Task] = {}
+
+
+def task(name: Optional[str] = None, max_attempts: int = 3):
+    def decorator(func: Callable) -> Task:
+        registered = Task(
+            func, name or f'{func.__module__}.{func.__name__}', max_attempts
+        )
+        registry[registered.name] = registered
+        return registered
+    return decorator
+
+
+def enqueue(
+    name: str,
+    payload: Optional[dict] = None,
+    user_id: Optional[int] = None,
+    delay: float = 0,
+) -> Job:
+    """Queue task ``name``; the worker sees it once the caller commits."""
+    if name not in registry:
+        raise KeyError(f'Unknown task: {name}')
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        user_id=user_id,
+        max_attempts=registry[name].max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_on_commit(
+    name: str,
+    payload: Optional[dict] = None,
+    user_id: Optional[int] = None,
+) -> None:
+    transaction.on_commit(lambda: enqueue(name, payload, user_id))
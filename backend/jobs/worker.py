@@ -0,0 +1,136 @@
+"""Claiming and running queued jobs.
+
+Workers claim due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any
+number of ``run_jobs`` processes can share the table without handing the
+same job out twice. A failed job is retried with exponential backoff
+until it runs out of attempts. While a worker holds claimed jobs, a
+heartbeat thread refreshes their ``updated_at`` every
+``JOBS['HEARTBEAT_INTERVAL']`` seconds; a job left ``running`` without a
+heartbeat for ``JOBS['STALE_AFTER']`` (its worker died) is picked up
+again, or marked failed if it has no attempts left, so a job that kills
+its worker cannot loop forever.
+"""
+from __future__ import annotations
+import logging
+import threading
+import traceback
+from datetime import timedelta
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .tasks import registry
+
+logger = logging.getLogger(__name__)
+
+STALE_ERROR = 'The worker stopped sending heartbeats for this job.'
+
+
+def claim(limit: int) -> List[Job]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS['STALE_AFTER'])
+    with transaction.atomic():
+        Job.objects.filter(
+            status=Job.RUNNING,
+            updated_at__lt=stale,
+            attempts__gte=F('max_attempts'),
+        ).update(status=Job.FAILED, last_error=STALE_ERROR, updated_at=now)
+        jobs = list(
+            Job.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Job.PENDING, run_after__lte=now)
+                | Q(
+                    status=Job.RUNNING,
+                    updated_at__lt=stale,
+                    attempts__lt=F('max_attempts'),
+                )
+            )
+            .order_by('run_after', 'id')[:limit]
+        )
+        for job in jobs:
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.updated_at = now
+        Job.objects.bulk_update(jobs, ['status', 'attempts', 'updated_at'])
+    return jobs
+
+
+class Heartbeat(threading.Thread):
+    """Keep ``updated_at`` of the claimed, unfinished jobs fresh."""
+
+    def __init__(self, job_ids: Iterable[int]):
+        super().__init__(name='jobs-heartbeat', daemon=True)
+        self.job_ids = set(job_ids)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def release(self, job_id: int) -> None:
+        with self._lock:
+            self.job_ids.discard(job_id)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def run(self) -> None:
+        interval = settings.JOBS['HEARTBEAT_INTERVAL']
+        try:
+            while not self._stopped.wait(interval):
+                with self._lock:
+                    job_ids = list(self.job_ids)
+                try:
+                    Job.objects.filter(
+                        pk__in=job_ids, status=Job.RUNNING
+                    ).update(updated_at=timezone.now())
+                except DatabaseError:
+                    logger.exception('Job heartbeat failed')
+        finally:
+            connection.close()
+
+
+def backoff(attempts: int) -> timedelta:
+    delay = settings.JOBS['RETRY_DELAY'] * 2 ** (attempts - 1)
+    return timedelta(seconds=delay)
+
+
+def run(job: Job) -> None:
+    task = registry.get(job.name)
+    try:
+        if task is None:
+            raise LookupError(f'Unknown task: {job.name}')
+        task(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if task is not None and job.attempts < job.max_attempts:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + backoff(job.attempts)
+        else:
+            job.status = Job.FAILED
+        logger.warning(
+            'Job %s #%s failed (attempt %d)', job.name, job.pk, job.attempts
+        )
+    else:
+        job.status = Job.DONE
+        job.last_error = ''
+    job.save(update_fields=['status', 'run_after', 'last_error', 'updated_at'])
+
+
+def run_pending(limit: int) -> int:
+    """Claim and run up to ``limit`` jobs; return how many were run."""
+    jobs = claim(limit)
+    if not jobs:
+        return 0
+    heartbeat = Heartbeat(job.pk for job in jobs)
+    heartbeat.start()
+    try:
+        for job in jobs:
+            run(job)
+            heartbeat.release(job.pk)
+    finally:
+        heartbeat.stop()
+    return len(jobs)
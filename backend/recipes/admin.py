@@ -43,7 +43,7 @@ class RecipeAdmin(admin.ModelAdmin):
 
     @admin.display(description='В избранном (кол-во)')
     def favorites_total(self, obj: Recipe) -> int:
-        return Favorite.objects.filter(recipe=obj).count()
+        return obj.favorites_count
 
 
 @admin.register(Ingredient)
@@ -74,5 +74,6 @@ class ShoppingCartAdmin(admin.ModelAdmin):
 
 @admin.register(RecipeShortLink)
 class RecipeShortLinkAdmin(admin.ModelAdmin):
-    list_display = ('recipe', 'code', 'created_at')
+    list_display = ('recipe', 'code', 'hits', 'created_at')
     search_fields = ('recipe__name', 'code')
+    readonly_fields = ('hits',)
@@ -0,0 +1,101 @@
+"""Denormalized counters on ``Recipe`` and ``User``.
+
+Request handlers adjust the counters (and ``User.last_recipe_at``) with
+``F()`` expressions in the same transaction as the row they create or
+delete. Writes that bypass those paths (admin, cascades, bulk scripts) are
+repaired by ``reconcile_counters``, which recomputes everything in bulk.
+Until then a counter may already be too low, so decrements stop at zero
+instead of tripping the unsigned column's check constraint.
+"""
+from __future__ import annotations
+from typing import Dict
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from users.models import Subscription
+from .models import Favorite, Recipe, ShoppingCart
+
+User = get_user_model()
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'in_carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'subscribers_count', Subscription, 'author'),
+)
+
+
+def shifted(field: str, delta: int):
+    if delta < 0:
+        return Greatest(F(field) + delta, 0)
+    return F(field) + delta
+
+
+def adjust(model, pk: int, **deltas: int) -> None:
+    model.objects.filter(pk=pk).update(
+        **{field: shifted(field, delta) for field, delta in deltas.items()}
+    )
+
+
+def latest_recipe_at():
+    return Subquery(
+        Recipe.objects
+        .filter(author=OuterRef('pk'))
+        .order_by('-created_at')
+        .values('created_at')[:1]
+    )
+
+
+def recipe_added(recipe: Recipe) -> None:
+    User.objects.filter(pk=recipe.author_id).update(
+        recipes_count=F('recipes_count') + 1,
+        last_recipe_at=recipe.created_at,
+    )
+
+
+def recipe_removed(author_id: int) -> None:
+    User.objects.filter(pk=author_id).update(
+        recipes_count=shifted('recipes_count', -1),
+        last_recipe_at=latest_recipe_at(),
+    )
+
+
+def actual_count(source, fk: str):
+    return Coalesce(
+        Subquery(
+            source.objects
+            .filter(**{fk: OuterRef('pk')})
+            .order_by()
+            .values(fk)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def reconcile_counters(dry_run: bool = False) -> Dict[str, int]:
+    """Fix drifted counters; return the number of rows fixed per counter."""
+    fixed = {}
+    for model, field, source, fk in COUNTERS:
+        actual = actual_count(source, fk)
+        drifted = model.objects.exclude(**{field: actual})
+        fixed[f'{model._meta.label}.{field}'] = (
+            drifted.count() if dry_run
+            else drifted.update(**{field: actual})
+        )
+    drifted = User.objects.alias(latest=latest_recipe_at()).filter(
+        Q(last_recipe_at__isnull=True, latest__isnull=False)
+        | Q(last_recipe_at__isnull=False, latest__isnull=True)
+        | (
+            Q(last_recipe_at__isnull=False, latest__isnull=False)
+            & ~Q(last_recipe_at=F('latest'))
+        )
+    )
+    fixed[f'{User._meta.label}.last_recipe_at'] = (
+        drifted.count() if dry_run
+        else drifted.update(last_recipe_at=latest_recipe_at())
+    )
+    return fixed
@@ -0,0 +1,118 @@
+"""Resized JPEG and WebP derivatives of uploaded images.
+
+Variant names are derived from the original file name alone
+(``recipes/1/2/photo.png`` -> ``recipes/1/2/variants/photo.small.webp``),
+so serializers build variant URLs without touching storage. Variants are
+written by a background job after the original is saved, or by the
+``generate_image_variants`` command. Both then store the original's name
+in ``<field>_variants_of``. Until that name matches the current image,
+no variant URLs are returned, so clients never get links that 404.
+"""
+from __future__ import annotations
+import posixpath
+from io import BytesIO
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps
+
+FORMATS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+
+def variant_name(name: str, size: str, fmt: str) -> str:
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(
+        directory, 'variants', f'{stem}.{size}.{FORMATS[fmt]}'
+    )
+
+
+def ready_field(field_name: str) -> str:
+    return f'{field_name}_variants_of'
+
+
+def variant_urls(field: FieldFile, request=None) -> Optional[Dict]:
+    """Return ``{size: {format: url}}`` for the variants of ``field``."""
+    if not field:
+        return None
+    ready = getattr(field.instance, ready_field(field.field.name))
+    if ready != field.name:
+        return None
+    urls = {}
+    for size in settings.IMAGE_VARIANTS['SIZES']:
+        urls[size] = {}
+        for fmt in FORMATS:
+            url = field.storage.url(variant_name(field.name, size, fmt))
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[size][fmt] = url
+    return urls
+
+
+def _encode(image: Image.Image, fmt: str) -> ContentFile:
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=fmt.upper(),
+        quality=settings.IMAGE_VARIANTS['QUALITY'],
+        optimize=fmt == 'jpeg',
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(field: FieldFile, force: bool = False) -> int:
+    """Write the missing variants of ``field``; return how many were."""
+    if not field:
+        return 0
+    storage = field.storage
+    sizes = settings.IMAGE_VARIANTS['SIZES']
+    names = {
+        (size, fmt): variant_name(field.name, size, fmt)
+        for size in sizes for fmt in FORMATS
+    }
+    if not force:
+        names = {
+            key: name for key, name in names.items()
+            if not storage.exists(name)
+        }
+    if not names:
+        return 0
+    with field.open('rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original = original.convert('RGB')
+    for size, edge in sizes.items():
+        image = original.copy()
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        for fmt in FORMATS:
+            name = names.get((size, fmt))
+            if name is None:
+                continue
+            # Delete first so the storage does not suffix the name.
+            storage.delete(name)
+            storage.save(name, _encode(image, fmt))
+    return len(names)
+
+
+def mark_variants_ready(instance, field_name: str) -> None:
+    """Record that variants exist for ``field_name`` as it was loaded."""
+    name = getattr(instance, field_name).name
+    with transaction.atomic():
+        current = (
+            type(instance).objects
+            .select_for_update()
+            .only('pk', field_name)
+            .filter(pk=instance.pk)
+            .first()
+        )
+        # A newer image has its own job; do not mark it with this one.
+        if current is None or getattr(current, field_name).name != name:
+            return
+        setattr(current, ready_field(field_name), name)
+        update_fields = [ready_field(field_name)]
+        if hasattr(current, 'updated_at'):
+            # Recipe validators and fragments are keyed on ``updated_at``.
+            update_fields.append('updated_at')
+        current.save(update_fields=update_fields)
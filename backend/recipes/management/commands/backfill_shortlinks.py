@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes.models import Recipe, RecipeShortLink
+from shortlinks.codes import encode
+
+
+class Command(BaseCommand):
+    help = 'Create deterministic short links for recipes that have none'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        recipe_ids = (
+            Recipe.objects
+            .filter(shortlink__isnull=True)
+            .values_list('id', flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+        created = 0
+        batch = []
+        for recipe_id in recipe_ids:
+            batch.append(
+                RecipeShortLink(recipe_id=recipe_id, code=encode(recipe_id))
+            )
+            if len(batch) == batch_size:
+                created += self._save(batch)
+                batch = []
+        created += self._save(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f'Created {created} short links')
+        )
+
+    def _save(self, batch) -> int:
+        return len(RecipeShortLink.objects.bulk_create(
+            batch, ignore_conflicts=True
+        ))
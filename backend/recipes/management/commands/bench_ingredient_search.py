@@ -0,0 +1,81 @@
+import csv
+import random
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from api.ingredient_index import IngredientIndex
+from recipes.models import Ingredient
+
+
+class Command(BaseCommand):
+    help = 'Compare ingredient autocomplete: in-memory index vs database'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--from',
+            dest='source',
+            default='../data/ingredients.csv',
+            help='CSV file with ingredients (name,measurement_unit)'
+        )
+        parser.add_argument('--queries', type=int, default=500)
+        parser.add_argument('--limit', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--skip-db',
+            action='store_true',
+            help='Benchmark only the in-memory index'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['source'])
+        if not path.exists():
+            self.stderr.write(self.style.ERROR(f'File not found: {path}'))
+            return
+        with path.open(encoding='utf-8') as f:
+            rows = [
+                (pk, row[0], row[1])
+                for pk, row in enumerate(csv.reader(f), start=1)
+                if row
+            ]
+        started = time.perf_counter()
+        index = IngredientIndex(rows)
+        self.stdout.write(
+            f'Built index of {len(index)} ingredients in '
+            f'{(time.perf_counter() - started) * 1000:.1f} ms'
+        )
+
+        rnd = random.Random(options['seed'])
+        queries = []
+        for _ in range(options['queries']):
+            name = rnd.choice(rows)[1]
+            queries.append(name[:rnd.randint(1, min(4, len(name)))])
+
+        limit = options['limit']
+        self._report('index', queries, lambda q: index.search(q, limit))
+        if not options['skip_db']:
+            self._report('database', queries, lambda q: list(
+                Ingredient.objects
+                .filter(name__istartswith=q)
+                .values('id', 'name', 'measurement_unit')[:limit]
+            ))
+
+    def _report(self, label, queries, search):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - started) * 1e6)
+        timings.sort()
+        self.stdout.write(self.style.SUCCESS(
+            '{label}: mean {mean:.1f} us, p50 {p50:.1f} us, '
+            'p99 {p99:.1f} us over {n} queries'.format(
+                label=label,
+                mean=statistics.fmean(timings),
+                p50=timings[len(timings) // 2],
+                p99=timings[int(len(timings) * 0.99) - 1],
+                n=len(timings),
+            )
+        ))
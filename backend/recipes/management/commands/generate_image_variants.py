@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes.images import (
+    generate_variants,
+    mark_variants_ready,
+    ready_field,
+)
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Build resized JPEG/WebP variants of recipe images and avatars'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild variants that already exist',
+        )
+
+    def handle(self, *args, **options):
+        sources = (
+            (Recipe.objects.exclude(image=''), 'image'),
+            (get_user_model().objects.exclude(avatar=''), 'avatar'),
+        )
+        written = failed = 0
+        for queryset, field_name in sources:
+            ready = ready_field(field_name)
+            queryset = queryset.only('pk', field_name, ready)
+            for instance in queryset.iterator():
+                field = getattr(instance, field_name)
+                try:
+                    written += generate_variants(field, options['force'])
+                except OSError as exc:
+                    failed += 1
+                    self.stderr.write(f'{field.name}: {exc}')
+                    continue
+                # Marking bumps updated_at, so skip images already marked.
+                if getattr(instance, ready) != field.name:
+                    mark_variants_ready(instance, field_name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Written {written} variants, {failed} images failed'
+        ))
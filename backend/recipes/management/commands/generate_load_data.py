@@ -0,0 +1,64 @@
+import time
+from dataclasses import fields
+
+from django.core.management.base import (
+    BaseCommand, CommandError, CommandParser,
+)
+
+from recipes.synthetic import Config, Generator
+
+HELP = {
+    'users': 'Number of users to create',
+    'recipes_per_user': 'Recipes authored by each user',
+    'subscriptions': 'Subscriptions per user',
+    'favorites': 'Favorite recipes per user',
+    'cart': 'Recipes in each shopping cart',
+    'ingredients_per_recipe': 'Ingredients per recipe',
+    'tags_per_recipe': 'Tags per recipe',
+    'zipf': 'Popularity skew; higher makes hot items hotter',
+    'image_pool': 'Shared placeholder images to reuse',
+    'unique_images': 'Render one image per recipe in worker processes',
+    'workers': 'Processes for --unique-images (default: CPU count)',
+    'batch_size': 'Rows per bulk_create',
+    'seed': 'Random seed; the same seed gives the same data',
+    'prefix': 'Username prefix of the generated users',
+}
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset of users, recipes and relations'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        for field in fields(Config):
+            option = '--' + field.name.replace('_', '-')
+            if field.type == 'bool':
+                parser.add_argument(
+                    option, action='store_true', help=HELP[field.name]
+                )
+                continue
+            parser.add_argument(
+                option,
+                type={'int': int, 'float': float}.get(
+                    field.type.replace('Optional[int]', 'int'), str
+                ),
+                default=field.default,
+                help=HELP[field.name],
+            )
+
+    def handle(self, *args, **options):
+        config = Config(**{
+            field.name: options[field.name] for field in fields(Config)
+        })
+        started = time.monotonic()
+        generator = Generator(config, log=self.stdout.write)
+        try:
+            created = generator.run()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.monotonic() - started
+        summary = ', '.join(
+            f'{count} {name}' for name, count in created.items()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {summary} in {elapsed:.1f}s'
+        ))
@@ -1,8 +1,62 @@
 import csv
+import io
 import json
+import time
 from pathlib import Path
-from django.core.management.base import BaseCommand, CommandParser
-from recipes.models import Ingredient
+from typing import Iterator, List, Tuple
+
+from django.core.management.base import (
+    BaseCommand, CommandError, CommandParser,
+)
+from django.db import connection, transaction
+from api import catalog
+from recipes.models import (
+    INGREDIENT_NAME_MAX_LENGTH,
+    INGREDIENT_UNIT_MAX_LENGTH,
+    Ingredient,
+)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+Row = Tuple[str, str]
+
+
+def read_csv(path: Path) -> Iterator[list]:
+    with path.open(encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if row:
+                yield row
+
+
+def read_json(path: Path) -> Iterator[dict]:
+    """Yield the items of a top-level JSON array, one at a time.
+
+    The file is read in chunks and each item is decoded with
+    ``raw_decode`` as soon as it is complete, so memory stays bounded by
+    the largest item rather than the whole file.
+    """
+    decoder = json.JSONDecoder()
+    with path.open(encoding='utf-8') as f:
+        buffer = f.read(READ_CHUNK_SIZE).lstrip()
+        if not buffer.startswith('['):
+            raise CommandError('JSON source must be an array')
+        pos = 1
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    raise CommandError(f'Malformed JSON near offset {pos}')
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
 
 
 class Command(BaseCommand):
@@ -15,6 +69,19 @@ class Command(BaseCommand):
             required=True,
             help='Path to CSV or JSON file'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per INSERT or COPY batch'
+        )
+        parser.add_argument(
+            '--method',
+            choices=('auto', 'bulk', 'copy'),
+            default='auto',
+            help='copy (PostgreSQL only) or bulk_create; auto picks copy '
+                 'when available'
+        )
 
     def handle(self, *args, **options):
         source = options['source']
@@ -22,33 +89,106 @@ class Command(BaseCommand):
         if not path.exists():
             self.stderr.write(self.style.ERROR(f'File not found: {source}'))
             return
-        count = 0
-        if path.suffix.lower() == '.csv':
-            with path.open(encoding='utf-8') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if not row:
-                        continue
-                    name, measurement_unit = row[0], row[1]
-                    Ingredient.objects.get_or_create(
-                        name=name,
-                        measurement_unit=measurement_unit
-                    )
-                    count += 1
-        elif path.suffix.lower() == '.json':
-            with path.open(encoding='utf-8') as f:
-                items = json.load(f)
-                for item in items:
-                    Ingredient.objects.get_or_create(
-                        name=item['name'],
-                        measurement_unit=item['measurement_unit']
-                    )
-                    count += 1
+        suffix = path.suffix.lower()
+        if suffix == '.csv':
+            records = (self.parse(row) for row in read_csv(path))
+        elif suffix == '.json':
+            records = (self.parse_item(item) for item in read_json(path))
         else:
             self.stderr.write(
                 self.style.ERROR('Unsupported format. Use .csv or .json')
             )
             return
-        self.stdout.write(
-            self.style.SUCCESS(f'Loaded {count} ingredients')
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('--method copy needs PostgreSQL')
+
+        self.read = self.invalid = self.duplicates = 0
+        started = time.monotonic()
+        with transaction.atomic():
+            before = Ingredient.objects.count()
+            write = self.copy if method == 'copy' else self.bulk_create
+            for batch in self.batches(records, options['batch_size']):
+                write(batch)
+            inserted = Ingredient.objects.count() - before
+        elapsed = time.monotonic() - started
+
+        catalog.bump_version()
+        unique = self.read - self.invalid - self.duplicates
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {self.read} rows via {method} in {elapsed:.2f}s '
+            f'({self.read / elapsed if elapsed else 0:.0f} rows/s): '
+            f'inserted {inserted}, skipped {unique - inserted} existing '
+            f'and {self.duplicates} duplicates, {self.invalid} invalid'
+        ))
+
+    def parse_item(self, item):
+        if not isinstance(item, dict):
+            return self.parse(None)
+        return self.parse((item.get('name'), item.get('measurement_unit')))
+
+    def parse(self, values):
+        """Return a clean ``(name, unit)`` or ``None`` for a bad record."""
+        self.read += 1
+        if not values or len(values) < 2:
+            return None
+        name, unit = values[0], values[1]
+        if not isinstance(name, str) or not isinstance(unit, str):
+            return None
+        name, unit = name.strip(), unit.strip()
+        if (
+            not name or not unit
+            or len(name) > INGREDIENT_NAME_MAX_LENGTH
+            or len(unit) > INGREDIENT_UNIT_MAX_LENGTH
+        ):
+            return None
+        return name, unit
+
+    def batches(self, records, size: int) -> Iterator[List[Row]]:
+        seen = set()
+        batch = []
+        for record in records:
+            if record is None:
+                self.invalid += 1
+                continue
+            if record in seen:
+                self.duplicates += 1
+                continue
+            seen.add(record)
+            batch.append(record)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def bulk_create(self, batch: List[Row]) -> None:
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in batch
+            ],
+            ignore_conflicts=True,
         )
+
+    def copy(self, batch: List[Row]) -> None:
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        data = io.StringIO()
+        csv.writer(data).writerows(batch)
+        data.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS ingredient_staging '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                'COPY ingredient_staging FROM STDIN WITH (FORMAT csv)', data
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT name, measurement_unit FROM ingredient_staging '
+                'ON CONFLICT (name, measurement_unit) DO NOTHING'
+            )
+            cursor.execute('TRUNCATE ingredient_staging')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from recipes import shopping
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or check) the per-user shopping list aggregate'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report users whose stored list has drifted'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drifted = shopping.find_drift()
+            if drifted:
+                self.stderr.write(self.style.ERROR(
+                    f'{len(drifted)} users drifted: '
+                    + ', '.join(str(pk) for pk in sorted(drifted)[:50])
+                ))
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS('Shopping lists are consistent.')
+                )
+            return
+        written = shopping.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt shopping lists: {written} rows')
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from recipes.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized favorite/cart/recipe/subscriber counters'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows have drifted'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = reconcile_counters(dry_run=options['dry_run'])
+        verb = 'drifted' if options['dry_run'] else 'fixed'
+        for label, rows in fixed.items():
+            self.stdout.write(f'{label}: {rows} rows {verb}')
+        self.stdout.write(self.style.SUCCESS('Counters reconciled.'))
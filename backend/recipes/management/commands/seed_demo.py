@@ -7,6 +7,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from PIL import Image, ImageDraw, ImageFont
 
+from recipes.counters import reconcile_counters
 from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
 
 
@@ -180,6 +181,7 @@ class Command(BaseCommand):
                 )
             )
 
+        reconcile_counters()
         self.stdout.write(
             self.style.SUCCESS('Demo data seeding complete.')
         )
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-17 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipeshortlink',
+            name='hits',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Переходы'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-17 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipeshortlink_hits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_variants_of',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='Варианты построены для'),
+        ),
+    ]
@@ -69,6 +69,13 @@ class Recipe(models.Model):
         upload_to=recipe_image_upload_to,
         verbose_name='Изображение'
     )
+    image_variants_of = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Варианты построены для'
+    )
     text = models.TextField(verbose_name='Описание')
     cooking_time = models.PositiveIntegerField(
         verbose_name='Время приготовления'
@@ -87,11 +94,31 @@ class Recipe(models.Model):
         auto_now_add=True,
         verbose_name='Создано'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В списках покупок'
+    )
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         default_related_name = 'recipes'
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='recipe_created_at_id_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -165,6 +192,33 @@ class ShoppingCart(UserRecipeRelation):
         verbose_name_plural = 'Покупки'
 
 
+class ShoppingListItem(models.Model):
+    """Per-user total of one ingredient over all recipes in the cart."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Ингредиент'
+    )
+    amount = models.PositiveIntegerField(verbose_name='Количество')
+    recipes_count = models.PositiveIntegerField(verbose_name='Рецептов')
+
+    class Meta:
+        unique_together = ('user', 'ingredient')
+        verbose_name = 'Позиция списка покупок'
+        verbose_name_plural = 'Список покупок'
+
+    def __str__(self) -> str:
+        return f"{self.user} — {self.ingredient}: {self.amount}"
+
+
 class RecipeShortLink(models.Model):
     recipe = models.OneToOneField(
         Recipe,
@@ -177,6 +231,11 @@ class RecipeShortLink(models.Model):
         unique=True,
         verbose_name='Код'
     )
+    hits = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Переходы'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Создано'
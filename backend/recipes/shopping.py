@@ -0,0 +1,138 @@
+"""Maintenance of the per-user ``ShoppingListItem`` aggregate.
+
+Instead of applying deltas, the affected ``(user, ingredient)`` keys are
+recomputed from the cart: adding a recipe touches only that recipe's
+ingredients, so the work stays proportional to the change while the table
+can never drift from its source.
+"""
+from __future__ import annotations
+from typing import Iterable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from .models import RecipeIngredient, ShoppingCart, ShoppingListItem
+
+User = get_user_model()
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def get_version(user_id: int) -> str:
+    """Return a token that changes whenever the user's list changes.
+
+    Rows are never updated in place: every change deletes them and inserts
+    new ones, whose ids are larger than any id seen before. The row count
+    and the largest id therefore identify the current list, straight from
+    the database and the same in every process.
+    """
+    stats = ShoppingListItem.objects.filter(user_id=user_id).aggregate(
+        rows=Count('id'), last=Max('id')
+    )
+    return f'{stats["rows"]}:{stats["last"]}'
+
+
+def aggregate(user_ids: Iterable[int] = None, ingredient_ids=None):
+    # A single filter() call keeps one join to the cart table.
+    filters = {'recipe__in_carts__isnull': False}
+    if user_ids is not None:
+        filters['recipe__in_carts__user_id__in'] = list(user_ids)
+    if ingredient_ids is not None:
+        filters['ingredient_id__in'] = list(ingredient_ids)
+    return (
+        RecipeIngredient.objects
+        .filter(**filters)
+        .values('recipe__in_carts__user_id', 'ingredient_id')
+        .annotate(total=Sum('amount'), recipes=Count('recipe_id'))
+        .order_by()
+    )
+
+
+def _items(rows):
+    for row in rows:
+        yield ShoppingListItem(
+            user_id=row['recipe__in_carts__user_id'],
+            ingredient_id=row['ingredient_id'],
+            amount=row['total'],
+            recipes_count=row['recipes'],
+        )
+
+
+@transaction.atomic
+def refresh(
+    user_ids: Iterable[int],
+    ingredient_ids: Optional[Iterable[int]] = None,
+) -> None:
+    """Recompute list rows of ``user_ids``, optionally for some ingredients."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    # Two refreshes of one user would otherwise both delete, then both
+    # insert the same (user, ingredient) keys. Locking the user rows, in
+    # a fixed order, makes the second one wait for the first to commit.
+    list(
+        User.objects.select_for_update()
+        .filter(pk__in=user_ids)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+    stale = ShoppingListItem.objects.filter(user_id__in=user_ids)
+    if ingredient_ids is not None:
+        ingredient_ids = list(ingredient_ids)
+        stale = stale.filter(ingredient_id__in=ingredient_ids)
+    stale.delete()
+    ShoppingListItem.objects.bulk_create(
+        _items(aggregate(user_ids, ingredient_ids))
+    )
+
+
+def recipe_ingredient_ids(recipe_id: int) -> list:
+    return list(
+        RecipeIngredient.objects
+        .filter(recipe_id=recipe_id)
+        .values_list('ingredient_id', flat=True)
+    )
+
+
+def recipe_carted_by(recipe_id: int) -> list:
+    return list(
+        ShoppingCart.objects
+        .filter(recipe_id=recipe_id)
+        .values_list('user_id', flat=True)
+    )
+
+
+@transaction.atomic
+def rebuild() -> int:
+    """Rebuild the whole table from the carts; return the rows written."""
+    ShoppingListItem.objects.all().delete()
+    written = 0
+    batch = []
+    for item in _items(aggregate().iterator()):
+        batch.append(item)
+        if len(batch) == REBUILD_BATCH_SIZE:
+            written += len(ShoppingListItem.objects.bulk_create(batch))
+            batch = []
+    written += len(ShoppingListItem.objects.bulk_create(batch))
+    return written
+
+
+def find_drift() -> set:
+    """Return ids of users whose stored list differs from their carts."""
+    expected = {
+        (row['recipe__in_carts__user_id'], row['ingredient_id']):
+            (row['total'], row['recipes'])
+        for row in aggregate().iterator()
+    }
+    stored = {
+        (user_id, ingredient_id): (amount, recipes_count)
+        for user_id, ingredient_id, amount, recipes_count in
+        ShoppingListItem.objects.values_list(
+            'user_id', 'ingredient_id', 'amount', 'recipes_count'
+        ).iterator()
+    }
+    return {
+        key[0] for key in expected.keys() | stored.keys()
+        if expected.get(key) != stored.get(key)
+    }
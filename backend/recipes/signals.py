@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobs.tasks import enqueue_on_commit
+from . import shopping
+from .models import Recipe, RecipeIngredient, ShoppingCart
+
+
+@receiver(post_save, sender=ShoppingCart)
+def cart_item_added(sender, instance, created, **kwargs):
+    if created:
+        shopping.refresh(
+            [instance.user_id],
+            shopping.recipe_ingredient_ids(instance.recipe_id),
+        )
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def cart_item_removed(sender, instance, **kwargs):
+    # The recipe's ingredients may already be gone in a cascade delete,
+    # so the whole list of this user is recomputed.
+    shopping.refresh([instance.user_id])
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def recipe_ingredient_saved(sender, instance, created, **kwargs):
+    # An edited row may have switched to another ingredient, whose old
+    # total is unknown here: refresh the carting users' lists entirely.
+    shopping.refresh(
+        shopping.recipe_carted_by(instance.recipe_id),
+        [instance.ingredient_id] if created else None,
+    )
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_deleted(sender, instance, **kwargs):
+    shopping.refresh(
+        shopping.recipe_carted_by(instance.recipe_id),
+        [instance.ingredient_id],
+    )
+
+
+def _enqueue_variants(instance, field_name: str, user_id, update_fields):
+    if update_fields is not None and field_name not in update_fields:
+        return
+    if not getattr(instance, field_name):
+        return
+    enqueue_on_commit(
+        'images.generate_variants',
+        {
+            'model': instance._meta.label,
+            'pk': instance.pk,
+            'field': field_name,
+        },
+        user_id=user_id,
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(sender, instance, update_fields=None, **kwargs):
+    _enqueue_variants(instance, 'image', instance.author_id, update_fields)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_avatar_saved(sender, instance, update_fields=None, **kwargs):
+    _enqueue_variants(instance, 'avatar', instance.pk, update_fields)
@@ -0,0 +1,283 @@
+"""Synthetic dataset generator for load tests and benchmarks.
+
+Everything is written with batched ``bulk_create`` (so no signals fire)
+and derived data is rebuilt once at the end with ``reconcile_counters``
+and ``shopping.rebuild``. Favorites, carts and subscriptions follow a
+Zipf-like popularity curve, so a few recipes and authors are hot, as in
+production. The same seed always produces the same dataset.
+"""
+from __future__ import annotations
+import io
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageDraw
+
+from . import shopping
+from .counters import reconcile_counters
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription
+
+IMAGE_SIZE = (320, 240)
+PASSWORD = 'Pass12345!'
+FALLBACK_TAGS = (
+    ('Завтрак', 'breakfast'),
+    ('Обед', 'lunch'),
+    ('Ужин', 'dinner'),
+)
+FALLBACK_INGREDIENTS = 200
+# Rounds of weighted draws before a sample is topped up uniformly.
+SAMPLE_ROUNDS = 8
+
+
+@dataclass
+class Config:
+    users: int = 100
+    recipes_per_user: int = 10
+    subscriptions: int = 10
+    favorites: int = 20
+    cart: int = 5
+    ingredients_per_recipe: int = 5
+    tags_per_recipe: int = 2
+    zipf: float = 1.1
+    image_pool: int = 16
+    unique_images: bool = False
+    workers: Optional[int] = None
+    batch_size: int = 5000
+    seed: int = 0
+    prefix: str = 'load'
+
+
+class ZipfSampler:
+    """Draws distinct items; the item at rank ``r`` has weight ``1/r**s``.
+
+    Ranks are assigned by a seeded shuffle, so which items are hot does
+    not depend on their ids.
+    """
+
+    def __init__(self, items: Sequence, s: float, rng: random.Random):
+        self.rng = rng
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(accumulate(
+            1 / rank ** s for rank in range(1, len(self.items) + 1)
+        ))
+
+    def sample(self, k: int, exclude=None) -> List:
+        k = min(k, len(self.items) - (exclude is not None))
+        chosen = {}
+        for _ in range(SAMPLE_ROUNDS):
+            if len(chosen) >= k:
+                break
+            for item in self.rng.choices(
+                self.items, cum_weights=self.cum_weights, k=k - len(chosen)
+            ):
+                if item != exclude:
+                    chosen[item] = None
+        if len(chosen) < k:
+            for item in self.rng.sample(self.items, len(self.items)):
+                if item != exclude:
+                    chosen[item] = None
+                    if len(chosen) >= k:
+                        break
+        return list(chosen)[:k]
+
+
+def render_image(seed: int) -> bytes:
+    """Render a small placeholder JPEG; runs in worker processes."""
+    rng = random.Random(seed)
+    image = Image.new(
+        'RGB',
+        IMAGE_SIZE,
+        tuple(rng.randint(60, 200) for _ in range(3)),
+    )
+    draw = ImageDraw.Draw(image)
+    draw.text((12, 12), f'#{seed}', fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=70)
+    return buffer.getvalue()
+
+
+def _store(data: bytes) -> str:
+    return default_storage.save('synthetic.jpg', ContentFile(data))
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Generator:
+    def __init__(self, config: Config, log: Callable[[str], None] = print):
+        self.config = config
+        self.log = log
+        self.rng = random.Random(config.seed)
+
+    def run(self) -> dict:
+        config = self.config
+        User = get_user_model()
+        if User.objects.filter(username__startswith=config.prefix).exists():
+            raise ValueError(
+                f'Users prefixed "{config.prefix}" exist; pick another prefix'
+            )
+        tag_ids = self.ensure_tags()
+        ingredient_ids = self.ensure_ingredients()
+        user_ids = self.create_users()
+        recipe_ids = self.create_recipes(user_ids, tag_ids, ingredient_ids)
+        relations = self.create_relations(user_ids, recipe_ids)
+        self.log('Reconciling counters and shopping lists')
+        reconcile_counters()
+        shopping.rebuild()
+        return {
+            'users': len(user_ids),
+            'recipes': len(recipe_ids),
+            **relations,
+        }
+
+    def ensure_tags(self) -> List[int]:
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                [Tag(name=name, slug=slug) for name, slug in FALLBACK_TAGS]
+            )
+        return list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+    def ensure_ingredients(self) -> List[int]:
+        if not Ingredient.objects.exists():
+            Ingredient.objects.bulk_create([
+                Ingredient(name=f'ингредиент {i}', measurement_unit='г')
+                for i in range(FALLBACK_INGREDIENTS)
+            ])
+        return list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def create_users(self) -> List[int]:
+        config = self.config
+        User = get_user_model()
+        password = make_password(PASSWORD)
+        ids = []
+        users = (
+            User(
+                username=f'{config.prefix}{i}',
+                email=f'{config.prefix}{i}@example.com',
+                first_name='Load',
+                last_name=f'User {i}',
+                password=password,
+            )
+            for i in range(config.users)
+        )
+        for batch in _batched(users, config.batch_size):
+            ids.extend(user.pk for user in User.objects.bulk_create(batch))
+        self.log(f'Created {len(ids)} users (password {PASSWORD})')
+        return ids
+
+    def images(self, count: int) -> Iterator[str]:
+        """Yield an image name for each of ``count`` recipes."""
+        config = self.config
+        base = config.seed * 1_000_003
+        if not config.unique_images:
+            pool = [
+                _store(render_image(base + i))
+                for i in range(max(config.image_pool, 1))
+            ]
+            for _ in range(count):
+                yield self.rng.choice(pool)
+            return
+        with ProcessPoolExecutor(config.workers) as executor:
+            rendered = executor.map(
+                render_image, range(base, base + count), chunksize=256
+            )
+            for data in rendered:
+                yield _store(data)
+
+    def create_recipes(self, user_ids, tag_ids, ingredient_ids) -> List[int]:
+        config = self.config
+        rng = self.rng
+        TagThrough = Recipe.tags.through
+        authors = (
+            author_id
+            for author_id in user_ids
+            for _ in range(config.recipes_per_user)
+        )
+        images = self.images(len(user_ids) * config.recipes_per_user)
+        recipe_ids = []
+        for batch in _batched(authors, config.batch_size):
+            recipes = Recipe.objects.bulk_create([
+                Recipe(
+                    author_id=author_id,
+                    name=f'Рецепт {len(recipe_ids) + n}',
+                    text='Синтетический рецепт для нагрузочного теста.',
+                    cooking_time=rng.randint(5, 180),
+                    image=next(images),
+                )
+                for n, author_id in enumerate(batch)
+            ])
+            tags = []
+            ingredients = []
+            for recipe in recipes:
+                for tag_id in rng.sample(
+                    tag_ids, min(config.tags_per_recipe, len(tag_ids))
+                ):
+                    tags.append(TagThrough(recipe_id=recipe.pk, tag_id=tag_id))
+                for ingredient_id in rng.sample(
+                    ingredient_ids,
+                    min(config.ingredients_per_recipe, len(ingredient_ids)),
+                ):
+                    ingredients.append(RecipeIngredient(
+                        recipe_id=recipe.pk,
+                        ingredient_id=ingredient_id,
+                        amount=rng.randint(1, 20) * 10,
+                    ))
+            TagThrough.objects.bulk_create(tags)
+            for chunk in _batched(ingredients, config.batch_size):
+                RecipeIngredient.objects.bulk_create(chunk)
+            recipe_ids.extend(recipe.pk for recipe in recipes)
+            self.log(f'Created {len(recipe_ids)} recipes')
+        return recipe_ids
+
+    def create_relations(self, user_ids, recipe_ids) -> dict:
+        config = self.config
+        authors = ZipfSampler(user_ids, config.zipf, self.rng)
+        recipes = ZipfSampler(recipe_ids, config.zipf, self.rng)
+        plan = (
+            (Subscription, 'author_id', authors, config.subscriptions),
+            (Favorite, 'recipe_id', recipes, config.favorites),
+            (ShoppingCart, 'recipe_id', recipes, config.cart),
+        )
+        created = {}
+        for model, field, sampler, per_user in plan:
+            rows = (
+                model(user_id=user_id, **{field: target})
+                for user_id in user_ids
+                for target in sampler.sample(
+                    per_user,
+                    exclude=user_id if model is Subscription else None,
+                )
+            )
+            count = 0
+            for batch in _batched(rows, config.batch_size):
+                model.objects.bulk_create(batch)
+                count += len(batch)
+            created[model._meta.model_name] = count
+            self.log(f'Created {count} {model._meta.verbose_name_plural}')
+        return created
@@ -0,0 +1,12 @@
+from django.apps import apps
+
+from jobs.tasks import task
+from .images import generate_variants, mark_variants_ready
+
+
+@task(name='images.generate_variants', max_attempts=3)
+def generate_image_variants(model: str, pk: int, field: str) -> None:
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is not None and getattr(instance, field):
+        generate_variants(getattr(instance, field))
+        mark_variants_ready(instance, field)
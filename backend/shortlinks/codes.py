@@ -0,0 +1,43 @@
+"""Deterministic short codes for recipes.
+
+A recipe id is mapped through an affine permutation of ``[0, 62**6)`` and
+written in base62, so codes are unique, look random, and decode back to
+the id without touching the database. Legacy random codes are four
+characters long and never collide with the six-character scheme.
+"""
+from __future__ import annotations
+import string
+from typing import Optional
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+CODE_LENGTH = 6
+SPACE = BASE ** CODE_LENGTH
+# Coprime with 62, so multiplication permutes the code space.
+MULTIPLIER = 1_580_030_173
+OFFSET = 24_903_277_457
+INVERSE = pow(MULTIPLIER, -1, SPACE)
+DIGITS = {char: value for value, char in enumerate(ALPHABET)}
+
+
+def encode(recipe_id: int) -> str:
+    number = (recipe_id * MULTIPLIER + OFFSET) % SPACE
+    chars = []
+    for _ in range(CODE_LENGTH):
+        number, digit = divmod(number, BASE)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def decode(code: str) -> Optional[int]:
+    """Return the recipe id for a deterministic code, else ``None``."""
+    if len(code) != CODE_LENGTH:
+        return None
+    number = 0
+    for char in code:
+        digit = DIGITS.get(char)
+        if digit is None:
+            return None
+        number = number * BASE + digit
+    recipe_id = (number - OFFSET) * INVERSE % SPACE
+    return recipe_id or None
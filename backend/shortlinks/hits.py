@@ -0,0 +1,100 @@
+"""Buffered click counters for short links.
+
+Redirects only bump an in-process counter keyed by recipe id. Once the
+buffer holds ``FLUSH_THRESHOLD`` hits or ``FLUSH_INTERVAL`` seconds have
+passed, the worker that noticed it swaps the buffer out and writes it with
+a single ``UPDATE ... SET hits = hits + CASE ...``. Hits still buffered
+when a worker dies are lost; that is an accepted trade-off.
+
+The flush also tells which of the clicked recipes no longer exist. Their
+ids go into ``gone``, so later redirects to them answer 404 without a
+query.
+"""
+from __future__ import annotations
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Set
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Case, F, Value, When
+
+from recipes.models import Recipe, RecipeShortLink
+from .codes import encode
+
+logger = logging.getLogger(__name__)
+
+# Ids of deleted recipes seen by this process. Ids are never reused.
+gone: Set[int] = set()
+
+
+class HitBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def record(self, recipe_id: int) -> None:
+        options = settings.SHORTLINK_HITS
+        with self._lock:
+            self._counts[recipe_id] += 1
+            self._pending += 1
+            due = (
+                self._pending >= options['FLUSH_THRESHOLD']
+                or time.monotonic() - self._flushed_at
+                >= options['FLUSH_INTERVAL']
+            )
+            counts = self._take() if due else None
+        if counts:
+            self._write(counts)
+
+    def flush(self) -> None:
+        with self._lock:
+            counts = self._take()
+        if counts:
+            self._write(counts)
+
+    def _take(self) -> Counter:
+        counts = self._counts
+        self._counts = Counter()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        return counts
+
+    def _write(self, counts: Counter) -> None:
+        try:
+            write_hits(counts)
+        except DatabaseError:
+            logger.exception(
+                'Dropped %d short link hits', sum(counts.values())
+            )
+
+
+def write_hits(counts: Counter) -> int:
+    """Add ``counts`` (recipe id -> hits) to the stored counters."""
+    links = dict(
+        Recipe.objects
+        .filter(pk__in=counts)
+        .values_list('pk', 'shortlink')
+    )
+    gone.update(pk for pk in counts if pk not in links)
+    missing = [pk for pk, link in links.items() if link is None]
+    RecipeShortLink.objects.bulk_create(
+        [RecipeShortLink(recipe_id=pk, code=encode(pk)) for pk in missing],
+        ignore_conflicts=True,
+    )
+    return RecipeShortLink.objects.filter(recipe_id__in=counts).update(
+        hits=F('hits') + Case(
+            *(When(recipe_id=pk, then=Value(n)) for pk, n in counts.items()),
+            default=Value(0),
+        )
+    )
+
+
+buffer = HitBuffer()
+record = buffer.record
+atexit.register(buffer.flush)
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from recipes.models import Recipe
+from . import hits
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    # Other workers learn about the deletion at their next hits flush.
+    recipe_id = instance.pk
+    transaction.on_commit(lambda: hits.gone.add(recipe_id))
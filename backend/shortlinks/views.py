@@ -1,7 +1,52 @@
-from django.shortcuts import redirect, get_object_or_404
-from recipes.models import RecipeShortLink
+from functools import lru_cache
+from typing import Optional
+
+from django.db.models import Max
+from django.http import Http404
+from django.shortcuts import redirect
+
+from recipes.models import Recipe, RecipeShortLink
+from . import hits
+from .codes import decode
+
+LEGACY_CODES_CACHE_SIZE = 4096
+
+# Highest recipe id seen by this process; refreshed when a code decodes
+# above it, so valid codes stay query-free and random six-character
+# strings (which decode to ids far beyond it) cost one indexed MAX().
+_highest_id = 0
+
+
+@lru_cache(maxsize=LEGACY_CODES_CACHE_SIZE)
+def _legacy_recipe_id(code: str) -> int:
+    # Raising on a miss keeps unknown codes out of the cache, so a flood
+    # of random four-character codes cannot evict the real ones.
+    return RecipeShortLink.objects.values_list(
+        'recipe_id', flat=True
+    ).get(code=code)
+
+
+def legacy_recipe_id(code: str) -> Optional[int]:
+    try:
+        return _legacy_recipe_id(code)
+    except RecipeShortLink.DoesNotExist:
+        return None
+
+
+def issued(recipe_id: int) -> bool:
+    global _highest_id
+    if recipe_id > _highest_id:
+        _highest_id = Recipe.objects.aggregate(top=Max('pk'))['top'] or 0
+    return recipe_id <= _highest_id
 
 
 def short_redirect(request, code: str):
-    link = get_object_or_404(RecipeShortLink, code=code)
-    return redirect(f"/recipes/{link.recipe_id}")
+    recipe_id = decode(code)
+    if recipe_id is None:
+        recipe_id = legacy_recipe_id(code)
+    elif not issued(recipe_id):
+        recipe_id = None
+    if recipe_id is None or recipe_id in hits.gone:
+        raise Http404
+    hits.record(recipe_id)
+    return redirect(f"/recipes/{recipe_id}")
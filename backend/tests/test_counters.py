@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Recipe
+
+User = get_user_model()
+
+
+class DriftedCounterTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            username='author',
+            password='Pass12345!',
+            first_name='A',
+            last_name='B',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            name='Рецепт',
+            text='Текст',
+            cooking_time=5,
+            image='recipes/images/test.jpg',
+        )
+        # Rows written past the request handlers leave the counters at 0.
+        Favorite.objects.create(user=self.author, recipe=self.recipe)
+        User.objects.filter(pk=self.author.pk).update(recipes_count=0)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_unfavorite_does_not_go_below_zero(self):
+        response = self.client.delete(
+            f'/api/recipes/{self.recipe.id}/favorite/'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 0)
+
+    def test_recipe_delete_does_not_go_below_zero(self):
+        response = self.client.delete(f'/api/recipes/{self.recipe.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 0)
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.images import mark_variants_ready
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class VariantsReadyTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            username='author',
+            password='Pass12345!',
+            first_name='A',
+            last_name='B',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            name='Рецепт',
+            text='Текст',
+            cooking_time=5,
+            image='recipes/images/test.jpg',
+        )
+        self.client = APIClient()
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def test_no_variants_until_marked(self):
+        response = self.client.get(self.url)
+        self.assertIsNone(response.data['image_variants'])
+        etag = response['ETag']
+        mark_variants_ready(self.recipe, 'image')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('small', response.data['image_variants'])
+
+    def test_new_image_hides_old_variants(self):
+        mark_variants_ready(self.recipe, 'image')
+        self.recipe.image = 'recipes/images/other.jpg'
+        self.recipe.save()
+        response = self.client.get(self.url)
+        self.assertIsNone(response.data['image_variants'])
+
+    def test_stale_job_does_not_mark_a_newer_image(self):
+        stale = Recipe.objects.get(pk=self.recipe.pk)
+        self.recipe.image = 'recipes/images/other.jpg'
+        self.recipe.save()
+        mark_variants_ready(stale, 'image')
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_variants_of, '')
+
+    def test_avatar_variants_follow_the_marker(self):
+        User.objects.filter(pk=self.author.pk).update(
+            avatar='users/1/avatar/a.png'
+        )
+        self.author.refresh_from_db()
+        response = self.client.get(f'/api/users/{self.author.pk}/')
+        self.assertIsNone(response.data['avatar_variants'])
+        mark_variants_ready(self.author, 'avatar')
+        response = self.client.get(f'/api/users/{self.author.pk}/')
+        self.assertIn('small', response.data['avatar_variants'])
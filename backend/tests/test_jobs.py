@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.serializers import JOB_ERROR_MESSAGE
+from jobs.models import Job
+
+User = get_user_model()
+TRACEBACK = 'Traceback (most recent call last):\nValueError: boom'
+
+
+class JobErrorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='user@example.com',
+            username='user',
+            password='Pass12345!',
+            first_name='A',
+            last_name='B',
+        )
+        self.job = Job.objects.create(
+            name='test.failing',
+            user=self.user,
+            status=Job.FAILED,
+            last_error=TRACEBACK,
+        )
+        self.client = APIClient()
+
+    def get_error(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get(f'/api/jobs/{self.job.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['last_error']
+
+    def test_owner_gets_a_short_message(self):
+        self.assertEqual(self.get_error(self.user), JOB_ERROR_MESSAGE)
+
+    def test_staff_get_the_traceback(self):
+        staff = User.objects.create_user(
+            email='staff@example.com',
+            username='staff',
+            password='Pass12345!',
+            first_name='C',
+            last_name='D',
+            is_staff=True,
+        )
+        self.assertEqual(self.get_error(staff), TRACEBACK)
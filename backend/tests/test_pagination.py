@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.pagination import CountStrategy, CountStrategyPaginator
+from recipes.models import Recipe
+
+User = get_user_model()
+COUNT_SETTINGS = {
+    'STRATEGY': 'cached',
+    'EXACT_THRESHOLD': 5,
+    'CACHE_TTL': 60,
+}
+
+
+class StaleCount(CountStrategy):
+    def count(self, queryset, cache_key):
+        return 3, True
+
+
+class ApproximatePageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com',
+            username='author',
+            password='Pass12345!',
+            first_name='A',
+            last_name='B',
+        )
+        cls.add_recipes(100)
+
+    @classmethod
+    def add_recipes(cls, number):
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.author,
+                name=f'Рецепт {i}',
+                text='Текст',
+                cooking_time=5,
+                image='recipes/images/test.jpg',
+            )
+            for i in range(number)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_neighbours_ignore_a_low_count(self):
+        paginator = CountStrategyPaginator(
+            Recipe.objects.order_by('pk'), 6, StaleCount(), 'stale'
+        )
+        page = paginator.page(4)
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.next_page_number(), 5)
+        self.assertEqual(page.previous_page_number(), 3)
+
+    @override_settings(PAGINATION_COUNT=COUNT_SETTINGS)
+    def test_stale_cached_count_does_not_break_next_link(self):
+        client = APIClient()
+        response = client.get('/api/recipes/?page=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 100)
+        self.add_recipes(20)
+        response = client.get('/api/recipes/?page=17')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['count_is_approximate'])
+        self.assertIn('page=18', response.data['next'])
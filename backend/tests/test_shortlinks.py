@@ -0,0 +1,60 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from recipes.models import Recipe, RecipeShortLink
+from shortlinks import hits
+from shortlinks.codes import encode
+from shortlinks.views import _legacy_recipe_id
+
+User = get_user_model()
+
+
+class ShortRedirectTests(TestCase):
+    def setUp(self):
+        hits.gone.clear()
+        _legacy_recipe_id.cache_clear()
+        self.author = User.objects.create_user(
+            email='author@example.com',
+            username='author',
+            password='Pass12345!',
+            first_name='A',
+            last_name='B',
+        )
+        self.recipe = self.add_recipe()
+
+    def tearDown(self):
+        hits.gone.clear()
+        _legacy_recipe_id.cache_clear()
+
+    def add_recipe(self):
+        return Recipe.objects.create(
+            author=self.author,
+            name='Рецепт',
+            text='Текст',
+            cooking_time=5,
+            image='recipes/images/test.jpg',
+        )
+
+    def test_deleted_recipe_is_not_found(self):
+        code = encode(self.recipe.pk)
+        self.add_recipe()
+        self.assertEqual(self.client.get(f'/s/{code}').status_code, 302)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        self.assertEqual(self.client.get(f'/s/{code}').status_code, 404)
+
+    def test_flush_reports_recipes_deleted_elsewhere(self):
+        recipe_id = self.recipe.pk
+        Recipe.objects.filter(pk=recipe_id).delete()
+        hits.gone.clear()
+        hits.write_hits(Counter({recipe_id: 1}))
+        self.assertIn(recipe_id, hits.gone)
+        response = self.client.get(f'/s/{encode(recipe_id)}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_legacy_code_is_not_cached(self):
+        self.assertEqual(self.client.get('/s/ab12').status_code, 404)
+        RecipeShortLink.objects.create(recipe=self.recipe, code='ab12')
+        self.assertEqual(self.client.get('/s/ab12').status_code, 302)
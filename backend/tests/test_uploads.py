@@ -0,0 +1,49 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from uploads.models import Upload
+
+User = get_user_model()
+
+
+def open_files() -> int:
+    return len(os.listdir('/proc/self/fd'))
+
+
+class UploadAsFileTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        user = User.objects.create_user(
+            email='user@example.com',
+            username='user',
+            password='Pass12345!',
+            first_name='A',
+            last_name='B',
+        )
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), 'red').save(buffer, 'JPEG')
+        self.content = buffer.getvalue()
+        self.upload = Upload(
+            user=user, format='jpeg', width=8, height=8,
+            size=len(self.content),
+        )
+        self.upload.file.save('x.jpg', ContentFile(self.content))
+
+    def test_copy_does_not_keep_the_stored_file_open(self):
+        before = open_files()
+        copies = [Upload.objects.get(pk=self.upload.pk).as_file()
+                  for _ in range(5)]
+        self.assertEqual(open_files(), before)
+        self.assertEqual(copies[0].read(), self.content)
+        self.assertTrue(copies[0].name.endswith('.jpg'))
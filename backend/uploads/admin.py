@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import Upload
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ('token', 'user', 'format', 'size', 'created_at')
+    search_fields = ('token', 'user__email')
+    readonly_fields = ('token', 'created_at')
@@ -0,0 +1,37 @@
+"""Header-only validation of uploaded images."""
+from __future__ import annotations
+from typing import NamedTuple
+
+from django.conf import settings
+from PIL import Image
+
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+
+
+class ImageInfo(NamedTuple):
+    format: str
+    width: int
+    height: int
+
+
+def inspect(file) -> ImageInfo:
+    """Identify ``file`` from its header and check the image structure.
+
+    Neither ``Image.open`` nor ``verify`` decodes pixel data, so the cost
+    does not grow with the resolution. Raises ``ValueError`` for anything
+    that is not an acceptable image.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            info = ImageInfo(image.format, *image.size)
+            if info.format not in EXTENSIONS:
+                raise ValueError(f'Unsupported format: {info.format}')
+            if info.width * info.height > settings.UPLOADS['MAX_PIXELS']:
+                raise ValueError('Image is too large')
+            image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ValueError(str(exc)) from exc
+    finally:
+        file.seek(0)
+    return info
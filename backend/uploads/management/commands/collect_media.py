@@ -0,0 +1,57 @@
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import models
+
+from uploads.storage import PREFIX, content_key
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete content-addressed media files (and their variants) that '
+        'no file field references'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        referenced = self.referenced_keys()
+        cutoff = time.time() - settings.MEDIA_GC_GRACE
+        root = default_storage.path(PREFIX)
+        deleted = kept = 0
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if (
+                    content_key(filename) in referenced
+                    or os.path.getmtime(path) > cutoff
+                ):
+                    kept += 1
+                    continue
+                deleted += 1
+                if not options['dry_run']:
+                    os.remove(path)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted} files, kept {kept}'
+        ))
+
+    def referenced_keys(self) -> set:
+        keys = set()
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if not isinstance(field, models.FileField):
+                    continue
+                names = (
+                    model._default_manager
+                    .filter(**{f'{field.attname}__startswith': PREFIX})
+                    .values_list(field.attname, flat=True)
+                    .iterator()
+                )
+                keys.update(content_key(name) for name in names)
+        return keys
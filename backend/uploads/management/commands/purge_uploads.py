@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from uploads.models import Upload
+
+
+class Command(BaseCommand):
+    help = 'Delete uploads older than UPLOADS["TTL"] seconds'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=settings.UPLOADS['TTL'])
+        deleted = 0
+        for upload in Upload.objects.filter(created_at__lt=cutoff).iterator():
+            upload.file.delete(save=False)
+            upload.delete()
+            deleted += 1
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} uploads'))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.14 on 2026-10-17 07:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uploads.models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Токен')),
+                ('file', models.FileField(upload_to=uploads.models.upload_file_upload_to, verbose_name='Файл')),
+                ('format', models.CharField(max_length=8, verbose_name='Формат')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Создано')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Загрузка',
+                'verbose_name_plural': 'Загрузки',
+            },
+        ),
+    ]
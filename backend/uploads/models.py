@@ -0,0 +1,65 @@
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import models
+
+UPLOAD_FORMAT_MAX_LENGTH = 8
+
+
+def upload_file_upload_to(instance: 'Upload', filename: str) -> str:
+    return f'uploads/{instance.user_id}/{filename}'
+
+
+class Upload(models.Model):
+    """An image uploaded ahead of the recipe or avatar that uses it."""
+
+    token = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+        verbose_name='Токен'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+        verbose_name='Пользователь'
+    )
+    file = models.FileField(
+        upload_to=upload_file_upload_to,
+        verbose_name='Файл'
+    )
+    format = models.CharField(
+        max_length=UPLOAD_FORMAT_MAX_LENGTH,
+        verbose_name='Формат'
+    )
+    width = models.PositiveIntegerField(verbose_name='Ширина')
+    height = models.PositiveIntegerField(verbose_name='Высота')
+    size = models.PositiveBigIntegerField(verbose_name='Размер, байт')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Создано'
+    )
+
+    class Meta:
+        verbose_name = 'Загрузка'
+        verbose_name_plural = 'Загрузки'
+
+    def __str__(self) -> str:
+        return str(self.token)
+
+    def as_file(self) -> File:
+        """Return a copy of the stored file for an image field.
+
+        The copy is read into memory (at most ``UPLOADS['MAX_SIZE']``) so
+        the stored file is closed at once, even if validation fails and
+        the copy is never saved.
+        """
+        with self.file.open('rb') as source:
+            return ContentFile(
+                source.read(), name=os.path.basename(self.file.name)
+            )
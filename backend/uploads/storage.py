@@ -0,0 +1,67 @@
+"""Content-addressed file storage for media.
+
+Originals are stored as ``cas/<aa>/<bb>/<sha256><ext>``: saving the same
+bytes twice returns the existing name without writing, and since such a
+name never changes content, nginx caches it forever. Derived files (image
+variants, named after their original, including originals stored before
+this scheme) and names that already live under ``cas/`` are stored as
+given. Variants are rewritten in place by ``generate_image_variants
+--force``, so they are served with revalidation rather than as immutable.
+
+Several rows may share one file, so deleting an original through a field
+is a no-op; ``collect_media`` removes files that nothing references.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+PREFIX = 'cas/'
+VARIANTS_DIR = '/variants/'
+
+
+def content_name(digest: str, ext: str) -> str:
+    return f'{PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def content_key(name: str) -> str:
+    """Hash shared by an original and the files derived from it."""
+    return posixpath.basename(name).split('.')[0].split('_')[0]
+
+
+def is_derived(name: str) -> bool:
+    return VARIANTS_DIR in name
+
+
+def is_original(name: str) -> bool:
+    return name.startswith(PREFIX) and not is_derived(name)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if name.startswith(PREFIX) or is_derived(name):
+            return super().save(name, content, max_length)
+        sha = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            sha.update(chunk)
+        content.seek(0)
+        ext = os.path.splitext(name)[1].lower()
+        name = content_name(sha.hexdigest(), ext)
+        if self.exists(name):
+            # Refresh mtime so collect_media treats the file as fresh.
+            os.utime(self.path(name))
+            return name
+        return self._save(name, content)
+
+    def delete(self, name):
+        if name and is_original(name):
+            return
+        super().delete(name)
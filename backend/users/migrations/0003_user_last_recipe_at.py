@@ -0,0 +1,36 @@
+# Generated by Django 4.2.14 on 2026-10-17 07:25
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_last_recipe_at(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    User.objects.update(last_recipe_at=Subquery(
+        Recipe.objects
+        .filter(author=OuterRef('pk'))
+        .order_by('-created_at')
+        .values('created_at')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_counters'),
+        ('recipes', '0005_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='last_recipe_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Последний рецепт'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-last_recipe_at', '-id'], name='user_last_recipe_at_idx'),
+        ),
+        migrations.RunPython(fill_last_recipe_at, migrations.RunPython.noop),
+    ]
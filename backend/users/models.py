@@ -24,6 +24,29 @@ class User(AbstractUser):
         blank=True,
         verbose_name='Аватар'
     )
+    avatar_variants_of = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Варианты построены для'
+    )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Рецептов'
+    )
+    subscribers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Подписчиков'
+    )
+    last_recipe_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Последний рецепт'
+    )
 
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     USERNAME_FIELD = 'email'
@@ -31,6 +54,12 @@ class User(AbstractUser):
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+        indexes = [
+            models.Index(
+                fields=['-last_recipe_at', '-id'],
+                name='user_last_recipe_at_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.email